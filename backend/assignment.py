@@ -0,0 +1,204 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+from metrics import PAIR_EVALUATIONS, stage
+
+# Score blocks are materialized a few million cells at a time so that the
+# candidates x internships matrix never has to exist densely in memory.
+BLOCK_CELLS = 1 << 22
+
+
+class DenseScores:
+    """ Adapts a precomputed candidates x internships score matrix to the ScoringEngine block interface. """
+
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=float)
+        if self.matrix.ndim != 2:
+            raise ValueError(f"Expected a candidates x internships matrix, got shape {self.matrix.shape}")
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def scores(self, rows=slice(None)):
+        return self.matrix[rows].copy()
+
+    def pair_scores(self, rows, cols):
+        return self.matrix[np.asarray(rows, dtype=int), np.asarray(cols, dtype=int)]
+
+
+def _score_block(source, rows, n_rows):
+    with stage("score"):
+        block = source.scores(rows)
+    PAIR_EVALUATIONS.inc(n_rows * source.shape[1])
+    return block
+
+
+def iter_blocks(source, rows=None):
+    """ Yields (row positions, score block) pairs covering `rows` (default: all rows). """
+    n_candidates, n_internships = source.shape
+    block_rows = max(1, BLOCK_CELLS // max(n_internships, 1))
+    if rows is None:
+        for start in range(0, n_candidates, block_rows):
+            stop = min(start + block_rows, n_candidates)
+            yield np.arange(start, stop), _score_block(source, slice(start, stop), stop - start)
+        return
+    for offset in range(0, len(rows), block_rows):
+        chunk = rows[offset:offset + block_rows]
+        yield chunk, _score_block(source, chunk, len(chunk))
+
+
+def _no_progress(**counts):
+    pass
+
+
+def top_k(source, k, capacity, progress=_no_progress):
+    """
+    Keeps only the `k` best open internships per candidate as a sparse matrix.
+    Internships without capacity are never kept.
+    """
+    n_candidates, n_internships = source.shape
+    open_mask = capacity > 0
+    k = min(k, int(open_mask.sum()))
+    row_parts, col_parts, score_parts = [], [], []
+    if k > 0:
+        for rows, block in iter_blocks(source):
+            block[:, ~open_mask] = -np.inf
+            cols = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            row_parts.append(np.repeat(rows, k))
+            col_parts.append(cols.ravel())
+            score_parts.append(np.take_along_axis(block, cols, axis=1).ravel())
+            progress(scored=int(rows[-1]) + 1)
+    if not row_parts:
+        return sparse.csr_matrix((n_candidates, n_internships))
+    return sparse.csr_matrix(
+        (np.concatenate(score_parts), (np.concatenate(row_parts), np.concatenate(col_parts))),
+        shape=(n_candidates, n_internships),
+    )
+
+
+class AllocationStrategy:
+    """
+    Base class for allocation strategies.
+
+    `assign` receives a score source (anything with `shape` and
+    `scores(rows)`, such as ScoringEngine or DenseScores) and the seat
+    capacity of every internship, and returns the internship position chosen
+    for each candidate, or -1 when the candidate stays unassigned.
+
+    `progress` is called with running `scored` / `assigned` candidate counts;
+    it may raise to abort a long allocation.
+    """
+
+    def __init__(self, config, progress=_no_progress):
+        self.config = config
+        self.progress = progress
+
+    def assign(self, source, capacity):
+        raise NotImplementedError
+
+
+class GreedyStrategy(AllocationStrategy):
+    """ Gives each candidate, in file order, the best internship that still has a seat. """
+
+    def assign(self, source, capacity, rows=None, assignment=None):
+        capacity = np.array(capacity, dtype=int)
+        if assignment is None:
+            assignment = np.full(source.shape[0], -1, dtype=int)
+        if source.shape[0] == 0 or source.shape[1] == 0:
+            return assignment
+        scored, full = 0, False
+        for block_rows, block in iter_blocks(source, rows):
+            scored += len(block_rows)
+            self.progress(scored=scored)
+            block[:, capacity <= 0] = -np.inf
+            for row, row_scores in zip(block_rows, block):
+                best = int(np.argmax(row_scores))
+                if row_scores[best] == -np.inf:
+                    full = True
+                    break
+                assignment[row] = best
+                capacity[best] -= 1
+                if capacity[best] == 0:
+                    # Later rows of this block must not see the filled internship.
+                    block[:, best] = -np.inf
+            self.progress(assigned=int((assignment >= 0).sum()))
+            if full:
+                break
+        # Once every seat is taken the remaining candidates stay unassigned without being scored.
+        self.progress(scored=source.shape[0] if rows is None else len(rows),
+                      assigned=int((assignment >= 0).sum()))
+        return assignment
+
+
+class OptimalStrategy(AllocationStrategy):
+    """
+    Maximizes the total score of the allocation under the `capacity` column.
+
+    Each internship is expanded into one column per seat and the problem is
+    solved as a minimum-cost bipartite matching. Candidates are only connected
+    to their top-k internships (config.ALLOCATION_TOP_K) which keeps the graph
+    sparse; every candidate also gets a private "unassigned" column with the
+    cost of a zero score so a full matching always exists. Candidates left
+    without a seat afterwards are filled greedily from the remaining capacity.
+    """
+
+    def assign(self, source, capacity):
+        capacity = np.asarray(capacity, dtype=int)
+        n_candidates, _ = source.shape
+        assignment = np.full(n_candidates, -1, dtype=int)
+        if n_candidates == 0:
+            return assignment
+
+        candidates_graph = top_k(source, self.config.ALLOCATION_TOP_K, capacity, self.progress).tocoo()
+        rows, cols, scores = candidates_graph.row, candidates_graph.col, candidates_graph.data
+
+        # No internship needs more seats than candidates that can reach it.
+        interested = np.bincount(cols, minlength=len(capacity))
+        seats = np.minimum(np.maximum(capacity, 0), interested)
+        seat_offsets = np.concatenate(([0], np.cumsum(seats)))
+        n_seats = int(seat_offsets[-1])
+
+        # Repeat every candidate/internship edge once per seat of the internship.
+        repeats = seats[cols]
+        edge_starts = np.concatenate(([0], np.cumsum(repeats)))[:-1]
+        seat_index = np.arange(int(repeats.sum())) - np.repeat(edge_starts, repeats)
+        seat_rows = np.repeat(rows, repeats)
+        seat_cols = np.repeat(seat_offsets[cols], repeats) + seat_index
+        seat_costs = 2.0 - np.repeat(scores, repeats)
+
+        # Costs are kept strictly positive; 2.0 is the cost of a zero score.
+        graph = sparse.csr_matrix(
+            (np.concatenate((seat_costs, np.full(n_candidates, 2.0))),
+             (np.concatenate((seat_rows, np.arange(n_candidates))),
+              np.concatenate((seat_cols, n_seats + np.arange(n_candidates))))),
+            shape=(n_candidates, n_seats + n_candidates),
+        )
+        matched_rows, matched_cols = min_weight_full_bipartite_matching(graph)
+
+        seat_owner = np.repeat(np.arange(len(capacity)), seats)
+        on_seat = matched_cols < n_seats
+        assignment[matched_rows[on_seat]] = seat_owner[matched_cols[on_seat]]
+        self.progress(assigned=int(on_seat.sum()))
+
+        remaining = capacity - np.bincount(assignment[assignment >= 0], minlength=len(capacity))
+        unassigned = np.flatnonzero(assignment < 0)
+        if len(unassigned) and (remaining > 0).any():
+            GreedyStrategy(self.config).assign(source, remaining, rows=unassigned, assignment=assignment)
+            self.progress(assigned=int((assignment >= 0).sum()))
+        return assignment
+
+
+STRATEGIES = {
+    "greedy": GreedyStrategy,
+    "optimal": OptimalStrategy,
+}
+
+
+def get_strategy(name, config, progress=_no_progress):
+    """ Looks up an allocation strategy by name. """
+    try:
+        return STRATEGIES[name](config, progress)
+    except KeyError:
+        raise ValueError(f"Unknown allocation strategy '{name}'. Available: {', '.join(STRATEGIES)}")
@@ -0,0 +1,115 @@
+"""
+Synthetic candidate and internship CSVs for benchmarking the allocation engine.
+
+Rows follow the layout of candidates.csv / internships.csv. Skills come from
+a shared vocabulary with a Zipf-like popularity per sector (a few very common
+skills, a long tail of rare ones); locations and sectors are skewed towards a
+handful of values and capacities are mostly small with a heavy tail.
+
+    python -m benchmarks.generate --candidates 100000 --internships 10000 --out /tmp/bench
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+
+SECTORS = ["technology", "fintech", "ecommerce", "healthcare", "marketing", "iot", "design",
+           "sales", "ai", "govtech", "edtech", "logistics"]
+LOCATIONS = ["bangalore", "delhi", "mumbai", "pune", "hyderabad", "chennai", "kolkata",
+             "ahmedabad", "jaipur", "lucknow", "kochi", "indore", "bhopal", "patna", "guwahati"]
+BASE_SKILLS = ["python", "sql", "pandas", "numpy", "java", "spring", "javascript", "react", "nodejs",
+               "mongodb", "c++", "embedded_c", "linux", "figma", "sketch", "seo", "sem", "crm",
+               "communication", "negotiation", "research", "writing", "tensorflow", "pytorch",
+               "excel", "tableau", "aws", "docker", "kubernetes", "flutter", "kotlin", "swift"]
+QUALIFICATIONS = ["B.Tech in Computer Science", "B.E. in Information Technology", "MCA", "BCA",
+                  "M.Tech in AI", "M.Sc. in Statistics", "MBA in Marketing", "BBA", "Bachelor of Design",
+                  "B.Tech in Electronics and Communication", "Masters in Public Policy", "B.Com"]
+ROLES = ["Intern", "Developer Intern", "Analyst Intern", "Research Intern", "Associate Intern"]
+
+
+def _zipf_probabilities(size, exponent):
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+class WorkloadGenerator:
+    """ Seeded generator; the same seed and sizes always produce the same files. """
+
+    def __init__(self, seed=0, vocabulary_size=2000, skew=1.1):
+        self.rng = np.random.default_rng(seed)
+        self.vocabulary = np.array(BASE_SKILLS + [f"skill_{i}" for i in range(vocabulary_size - len(BASE_SKILLS))])
+        self.skill_probabilities = _zipf_probabilities(len(self.vocabulary), skew)
+        # Each sector ranks the vocabulary differently, so popular skills differ per sector.
+        self.sector_rankings = np.array([self.rng.permutation(len(self.vocabulary)) for _ in SECTORS])
+        self.sector_probabilities = _zipf_probabilities(len(SECTORS), 0.8)
+        self.location_probabilities = _zipf_probabilities(len(LOCATIONS), 1.0)
+
+    def _skills(self, sectors, low, high):
+        counts = self.rng.integers(low, high + 1, size=len(sectors))
+        ranks = self.rng.choice(len(self.vocabulary), size=(len(sectors), high), p=self.skill_probabilities)
+        skills = self.vocabulary[self.sector_rankings[sectors[:, None], ranks]]
+        return [",".join(dict.fromkeys(row[:count])) for row, count in zip(skills, counts)]
+
+    def candidates(self, n, start_id=1):
+        sectors = self.rng.choice(len(SECTORS), size=n, p=self.sector_probabilities)
+        return pd.DataFrame({
+            "id": np.arange(start_id, start_id + n),
+            "name": [f"Candidate {i}" for i in range(start_id, start_id + n)],
+            "skills": self._skills(sectors, 2, 6),
+            "qualifications": self.rng.choice(QUALIFICATIONS, size=n),
+            "location_preferences": self.rng.choice(LOCATIONS, size=n, p=self.location_probabilities),
+            "sector_interests": np.array(SECTORS)[sectors],
+            "category": np.where(self.rng.random(n) < 0.35, "Rural", "Urban"),
+            "past_internship": np.where(self.rng.random(n) < 0.3, "TRUE", "FALSE"),
+        })
+
+    def internships(self, n, start_id=1):
+        sectors = self.rng.choice(len(SECTORS), size=n, p=self.sector_probabilities)
+        # Mostly 1-5 seats with a heavy tail of large programmes.
+        capacity = np.minimum(np.ceil(self.rng.lognormal(mean=0.8, sigma=0.9, size=n)), 200).astype(int)
+        roles = self.rng.choice(ROLES, size=n)
+        return pd.DataFrame({
+            "id": np.arange(start_id, start_id + n),
+            "title": [f"{SECTORS[s].title()} {role}" for s, role in zip(sectors, roles)],
+            "required_skills": self._skills(sectors, 2, 4),
+            "qualifications": self.rng.choice(QUALIFICATIONS, size=n),
+            "location": self.rng.choice(LOCATIONS, size=n, p=self.location_probabilities),
+            "organization": [f"Organization {i}" for i in self.rng.integers(1, max(n // 5, 2), size=n)],
+            "description": "Synthetic benchmark posting",
+            "sector": np.array(SECTORS)[sectors],
+            "capacity": capacity,
+        })
+
+    def write(self, kind, n, path):
+        """ Writes `n` rows of `kind` ('candidates' or 'internships') in chunks. """
+        make = self.candidates if kind == "candidates" else self.internships
+        for start in range(0, n, CHUNK_ROWS):
+            chunk = make(min(CHUNK_ROWS, n - start), start_id=start + 1)
+            chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+        return path
+
+
+def generate_workload(out_dir, n_candidates, n_internships, seed=0):
+    """ Writes candidates.csv and internships.csv into `out_dir`; returns both paths. """
+    os.makedirs(out_dir, exist_ok=True)
+    generator = WorkloadGenerator(seed)
+    return (generator.write("candidates", n_candidates, os.path.join(out_dir, "candidates.csv")),
+            generator.write("internships", n_internships, os.path.join(out_dir, "internships.csv")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--internships", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=".")
+    args = parser.parse_args()
+    for path in generate_workload(args.out, args.candidates, args.internships, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark harness for the allocation engine.
+
+For every workload size it generates synthetic CSVs (see benchmarks.generate)
+and times each stage on its own -- parse, vectorize, score, assign,
+serialize -- plus an end-to-end POST /allocate through a local TestClient.
+Every measurement records wall time, peak RSS, the growth of RSS over the
+stage (what the stage itself allocated, independent of what earlier stages
+left behind) and candidate/internship pairs per second. Results are written
+as JSON; with --baseline they are compared against a previous run on the
+same machine and the exit code is 1 if any stage got slower or larger than
+the baseline's thresholds allow. Baselines are machine-specific, so none is
+committed: record one with --update-baseline first.
+
+    python -m benchmarks.run --sizes 1000x100,10000x1000 --output bench.json
+    python -m benchmarks.run --sizes 1000x100 --baseline baseline.json --update-baseline
+    python -m benchmarks.run --sizes 1000x100 --baseline baseline.json
+
+Run it from the backend directory.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+from assignment import get_strategy, iter_blocks
+from benchmarks.generate import generate_workload
+from ingestion import CANDIDATE_SCHEMA, INTERNSHIP_SCHEMA, read_table
+from main import InternshipRecommender, RecommendationConfig, app
+from scoring import ScoringEngine
+from serialization import dumps, iter_records
+
+STAGES = ("parse", "vectorize", "score", "assign", "serialize", "end_to_end")
+# Allowed ratio to the baseline before a stage counts as a regression.
+DEFAULT_THRESHOLDS = {"wall_s": 1.25, "rss_delta_mb": 1.20}
+# Measurements below these floors are too noisy to gate on.
+NOISE_FLOORS = {"wall_s": 0.05, "rss_delta_mb": 20.0}
+
+
+def _current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # No procfs (macOS): fall back to the process-wide high-water mark.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class StageTimer:
+    """
+    Measures wall time and peak RSS (sampled every few ms) of a block, and the
+    peak's growth over the RSS at entry. Without procfs RSS is the process
+    high-water mark, so the delta only shows stages that raise it.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+
+    def __enter__(self):
+        self.start_rss_mb = self.peak_rss_mb = _current_rss_mb()
+        self._running = True
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self._start = time.perf_counter()
+        return self
+
+    def _sample(self):
+        while self._running:
+            self.peak_rss_mb = max(self.peak_rss_mb, _current_rss_mb())
+            time.sleep(self.interval)
+
+    def __exit__(self, *exc):
+        self.wall_s = time.perf_counter() - self._start
+        self._running = False
+        self._sampler.join()
+        self.peak_rss_mb = max(self.peak_rss_mb, _current_rss_mb())
+        self.rss_delta_mb = self.peak_rss_mb - self.start_rss_mb
+
+
+def _record(results, stage, timer, pairs, **extra):
+    results[stage] = {
+        "wall_s": round(timer.wall_s, 4),
+        "peak_rss_mb": round(timer.peak_rss_mb, 1),
+        "rss_delta_mb": round(timer.rss_delta_mb, 1),
+        "pairs_per_s": round(pairs / timer.wall_s) if timer.wall_s > 0 else None,
+        **extra,
+    }
+
+
+def benchmark_size(n_candidates, n_internships, strategy, seed, workdir):
+    """ Runs every stage for one workload size; returns {stage: metrics}. """
+    candidates_path, internships_path = generate_workload(workdir, n_candidates, n_internships, seed)
+    config = RecommendationConfig()
+    recommender = InternshipRecommender(config)
+    pairs = n_candidates * n_internships
+    results = {}
+
+    with StageTimer() as timer:
+        with open(candidates_path, "rb") as f:
+            candidates_df = read_table(f, CANDIDATE_SCHEMA)
+        with open(internships_path, "rb") as f:
+            internships_df = read_table(f, INTERNSHIP_SCHEMA)
+    _record(results, "parse", timer, pairs, rows=n_candidates + n_internships)
+
+    with StageTimer() as timer:
+        engine = ScoringEngine(config).fit(candidates_df, internships_df)
+    _record(results, "vectorize", timer, pairs)
+
+    with StageTimer() as timer:
+        for _ in iter_blocks(engine):
+            pass
+    _record(results, "score", timer, pairs)
+
+    # Strategies pull score blocks from the engine, so this includes re-scoring.
+    capacity = internships_df["capacity"].to_numpy()
+    with StageTimer() as timer:
+        assignment = get_strategy(strategy, config).assign(engine, capacity)
+    _record(results, "assign", timer, pairs, assigned=int((assignment >= 0).sum()))
+
+    with StageTimer() as timer:
+        scores, reasons = recommender.describe(engine, engine.explain, assignment)
+        columns = recommender.allocation_columns(candidates_df, internships_df, assignment, scores, reasons)
+        body = dumps({"allocations": list(iter_records(columns))})
+    _record(results, "serialize", timer, pairs, bytes=len(body))
+
+    from fastapi.testclient import TestClient
+    # Startup and shutdown of the app (job pool, manager) are not part of a request.
+    with TestClient(app) as client:
+        with open(candidates_path, "rb") as candidates, open(internships_path, "rb") as internships:
+            with StageTimer() as timer:
+                response = client.post(f"/allocate?strategy={strategy}",
+                                       files={"candidates": candidates, "internships": internships})
+    response.raise_for_status()
+    _record(results, "end_to_end", timer, pairs)
+    return results
+
+
+def compare(results, baseline):
+    """ Returns human-readable regressions of `results` against `baseline`. """
+    thresholds = {**DEFAULT_THRESHOLDS, **baseline.get("thresholds", {})}
+    regressions = []
+    for size, stages in results["results"].items():
+        for stage, metrics in stages.items():
+            reference = baseline.get("results", {}).get(size, {}).get(stage)
+            if not reference:
+                continue
+            for metric, ratio in thresholds.items():
+                before, after = reference.get(metric), metrics.get(metric)
+                if before is None or after is None or max(before, after) < NOISE_FLOORS.get(metric, 0):
+                    continue
+                if after > before * ratio:
+                    regressions.append(f"{size} {stage}: {metric} {before} -> {after} (limit x{ratio})")
+    return regressions
+
+
+def parse_size(text):
+    candidates, internships = text.lower().split("x")
+    return int(candidates), int(internships)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000x100,10000x1000",
+                        help="comma-separated CANDIDATESxINTERNSHIPS workload sizes")
+    parser.add_argument("--strategy", default=RecommendationConfig.ALLOCATION_STRATEGY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with these results")
+    args = parser.parse_args()
+
+    results = {
+        "strategy": args.strategy,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {},
+    }
+    for size in args.sizes.split(","):
+        n_candidates, n_internships = parse_size(size)
+        with tempfile.TemporaryDirectory() as workdir:
+            stages = benchmark_size(n_candidates, n_internships, args.strategy, args.seed, workdir)
+        results["results"][size] = stages
+        for stage in STAGES:
+            metrics = stages[stage]
+            print(f"{size:>14} {stage:<11} {metrics['wall_s']:>9.3f}s {metrics['peak_rss_mb']:>9.1f}MB "
+                  f"{metrics['rss_delta_mb']:>+9.1f}MB "
+                  f"{metrics['pairs_per_s'] or 0:>14,} pairs/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        thresholds = DEFAULT_THRESHOLDS
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                thresholds = json.load(f).get("thresholds", thresholds)
+        results["thresholds"] = thresholds
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    elif args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
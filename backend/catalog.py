@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+from ingestion import INTERNSHIP_SCHEMA, read_table
+from scoring import TEXT_FIELDS, FieldIndex, InternshipIndex
+
+# Bump whenever the on-disk layout or the tokenization changes; it is part of
+# every catalog id, so old versions are simply never matched again.
+INDEX_FORMAT_VERSION = 1
+HASH_CHUNK_BYTES = 1 << 20
+
+
+class CatalogNotFound(KeyError):
+    """ Raised when a catalog id is not present in the store. """
+
+
+class CatalogStore:
+    """
+    Persistent, versioned internship catalogs.
+
+    Each uploaded internship file is keyed by the hash of its content and
+    stored in its own directory: the parsed table plus, per text field, the
+    vocabulary, document frequencies and the term-count matrix as .npy files;
+    IDF weights are derived from the stored document frequencies at scoring
+    time, together with the candidates of each request. Arrays are opened with mmap_mode='r', so several uvicorn
+    workers share one copy of the pages through the OS cache. Catalogs are
+    written to a temporary directory and renamed into place, which keeps
+    concurrent readers safe.
+
+    Loaded indexes are kept in an in-process LRU of `max_loaded` entries; on
+    disk at most `max_versions` catalogs are kept, evicting the least
+    recently used.
+    """
+
+    def __init__(self, root, max_loaded=4, max_versions=20):
+        self.root = root
+        self.max_loaded = max_loaded
+        self.max_versions = max_versions
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, catalog_id, *parts):
+        # Ids are hex digests; anything else could escape the store directory.
+        if not catalog_id.isalnum():
+            raise CatalogNotFound(catalog_id)
+        return os.path.join(self.root, catalog_id, *parts)
+
+    def _exists(self, catalog_id):
+        return os.path.isfile(self._path(catalog_id, "manifest.json"))
+
+    def put(self, upload):
+        """ Stores an uploaded internship file; returns (manifest, created). """
+        stream = getattr(upload, "file", upload)
+        digest = hashlib.sha256(f"v{INDEX_FORMAT_VERSION}:".encode())
+        for block in iter(lambda: stream.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+        stream.seek(0)
+        catalog_id = digest.hexdigest()[:16]
+
+        if self._exists(catalog_id):
+            return self.manifest(catalog_id), False
+
+        table = read_table(upload, INTERNSHIP_SCHEMA)
+        index = InternshipIndex.build(table)
+        manifest = {
+            "catalog_id": catalog_id,
+            "filename": getattr(upload, "filename", None),
+            "rows": len(index),
+            "total_capacity": int(table["capacity"].sum()),
+            "created_at": time.time(),
+            "format_version": INDEX_FORMAT_VERSION,
+        }
+
+        staging = tempfile.mkdtemp(dir=self.root, prefix=".staging-")
+        try:
+            table.to_csv(os.path.join(staging, "internships.csv"), index=False)
+            np.save(os.path.join(staging, "locations.npy"), index.locations)
+            for (_, column, _), field in zip(TEXT_FIELDS, index.fields):
+                prefix = os.path.join(staging, column)
+                np.save(f"{prefix}.vocabulary.npy", field.vocabulary)
+                np.save(f"{prefix}.df.npy", field.document_frequency)
+                np.save(f"{prefix}.data.npy", field.counts.data)
+                np.save(f"{prefix}.indices.npy", field.counts.indices)
+                np.save(f"{prefix}.indptr.npy", field.counts.indptr)
+            with open(os.path.join(staging, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            os.rename(staging, self._path(catalog_id))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            # Another worker stored the same content first.
+            if not self._exists(catalog_id):
+                raise
+
+        with self._lock:
+            self._remember(catalog_id, index)
+        self._evict_versions()
+        return manifest, True
+
+    def manifest(self, catalog_id):
+        try:
+            with open(self._path(catalog_id, "manifest.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            raise CatalogNotFound(catalog_id)
+
+    def list(self):
+        """ Manifests of all stored catalogs, most recently used first. """
+        manifests = []
+        for catalog_id in self._catalog_ids():
+            try:
+                manifests.append(self.manifest(catalog_id))
+            except CatalogNotFound:
+                continue
+        return manifests
+
+    def get(self, catalog_id):
+        """ Returns the InternshipIndex for a catalog, loading it on first use. """
+        try:
+            # The manifest's mtime records last use and drives on-disk eviction.
+            os.utime(self._path(catalog_id, "manifest.json"))
+        except FileNotFoundError:
+            raise CatalogNotFound(catalog_id)
+        except OSError:
+            pass  # read-only store: eviction order just falls back to creation time
+        with self._lock:
+            if catalog_id in self._loaded:
+                self._loaded.move_to_end(catalog_id)
+                return self._loaded[catalog_id]
+        index = self._load(catalog_id)
+        with self._lock:
+            self._remember(catalog_id, index)
+        return index
+
+    def delete(self, catalog_id):
+        if not self._exists(catalog_id):
+            raise CatalogNotFound(catalog_id)
+        with self._lock:
+            self._loaded.pop(catalog_id, None)
+        shutil.rmtree(self._path(catalog_id), ignore_errors=True)
+
+    def warm(self, count):
+        """ Loads the `count` most recently used catalogs ahead of the first request. """
+        for catalog_id in self._catalog_ids()[:count]:
+            try:
+                self.get(catalog_id)
+            except CatalogNotFound:
+                continue
+
+    def _load(self, catalog_id):
+        if not self._exists(catalog_id):
+            raise CatalogNotFound(catalog_id)
+        with open(self._path(catalog_id, "internships.csv"), "rb") as f:
+            table = read_table(f, INTERNSHIP_SCHEMA, source="stored")
+
+        load = lambda name: np.load(self._path(catalog_id, name), mmap_mode="r")
+        fields = []
+        for _, column, _ in TEXT_FIELDS:
+            vocabulary = load(f"{column}.vocabulary.npy")
+            counts = sparse.csr_matrix(
+                (load(f"{column}.data.npy"), load(f"{column}.indices.npy"), load(f"{column}.indptr.npy")),
+                shape=(len(table), len(vocabulary)), copy=False)
+            fields.append(FieldIndex(vocabulary, counts, load(f"{column}.df.npy")))
+        return InternshipIndex(table, fields, load("locations.npy"))
+
+    def _remember(self, catalog_id, index):
+        self._loaded[catalog_id] = index
+        self._loaded.move_to_end(catalog_id)
+        while len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+
+    def _catalog_ids(self):
+        entries = []
+        for catalog_id in os.listdir(self.root):
+            if not catalog_id.isalnum():
+                continue  # staging directories
+            try:
+                entries.append((os.path.getmtime(self._path(catalog_id, "manifest.json")), catalog_id))
+            except OSError:
+                continue
+        return [catalog_id for _, catalog_id in sorted(entries, reverse=True)]
+
+    def _evict_versions(self):
+        for catalog_id in self._catalog_ids()[self.max_versions:]:
+            with self._lock:
+                self._loaded.pop(catalog_id, None)
+            shutil.rmtree(self._path(catalog_id), ignore_errors=True)
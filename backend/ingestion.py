@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from metrics import ROWS_PROCESSED, stage
+
+# Rows parsed per chunk; keeps the working set small for large uploads.
+CHUNK_ROWS = 50_000
+# Row-level problems kept (and listed in the error message); the rest are only counted.
+MAX_REPORTED_ERRORS = 10
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+class IngestionError(ValueError):
+    """ Raised when an uploaded file does not match its schema. """
+
+    def __init__(self, table, errors, total=None):
+        self.table = table
+        self.errors = list(errors[:MAX_REPORTED_ERRORS])
+        self.total = len(errors) if total is None else total
+        shown = "; ".join(self.errors)
+        more = f" (and {self.total - len(self.errors)} more)" if self.total > len(self.errors) else ""
+        super().__init__(f"Invalid {table} file: {shown}{more}")
+
+    def __reduce__(self):
+        # Keeps the error picklable across process boundaries (allocation jobs).
+        return IngestionError, (self.table, self.errors, self.total)
+
+
+class TableSchema:
+    """ Required columns and explicit dtypes for one kind of upload. """
+
+    def __init__(self, name, required, categorical=(), integer=()):
+        self.name = name
+        self.required = required
+        self.categorical = categorical
+        self.integer = integer
+
+
+CANDIDATE_SCHEMA = TableSchema(
+    "candidates",
+    required=("name",),
+    categorical=("category", "location_preferences"),
+)
+
+INTERNSHIP_SCHEMA = TableSchema(
+    "internships",
+    required=("title", "capacity"),
+    categorical=("location",),
+    integer=("capacity",),
+)
+
+
+def _iter_csv_chunks(stream):
+    # Everything is read as text with blanks kept as '' (the old fillna('')),
+    # then typed per chunk, so no full decoded copy of the upload is ever made.
+    reader = pd.read_csv(stream, dtype=str, keep_default_na=False, encoding="utf-8", chunksize=CHUNK_ROWS)
+    with reader:
+        yield from reader
+
+
+def _iter_excel_chunks(stream):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = ["" if value is None else str(value).strip() for value in header]
+        batch, yielded = [], False
+        for row in rows:
+            batch.append(["" if value is None else str(value) for value in row])
+            if len(batch) == CHUNK_ROWS:
+                yield pd.DataFrame(batch, columns=columns)
+                batch, yielded = [], True
+        if batch or not yielded:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _typed_chunk(chunk, schema, first_row, errors):
+    """
+    Applies the schema's dtypes in place. Invalid integers are described in
+    `errors` up to MAX_REPORTED_ERRORS; returns how many were found in total.
+    """
+    invalid_count = 0
+    for column in schema.integer:
+        raw = chunk[column].str.strip()
+        values = pd.to_numeric(raw, errors="coerce")
+        invalid = (raw != "") & (values.isna() | (values % 1 != 0))
+        positions = np.flatnonzero(invalid.to_numpy())
+        invalid_count += len(positions)
+        for position in positions[:max(MAX_REPORTED_ERRORS - len(errors), 0)]:
+            errors.append(f"row {first_row + position}: {column} '{raw.iloc[position]}' is not an integer")
+        chunk[column] = values.where(~invalid).fillna(0).astype("int64")
+    for column in schema.categorical:
+        if column in chunk.columns:
+            chunk[column] = chunk[column].astype("category")
+    return invalid_count
+
+
+def read_table(upload, schema, filename=None, source="upload"):
+    """
+    Parses an uploaded CSV or Excel file chunk by chunk straight from its
+    spooled byte stream and returns a DataFrame with the schema's dtypes.
+    `upload` is an UploadFile or a binary stream; `filename` overrides the
+    name used to tell Excel from CSV. `source` is "stored" when re-reading a
+    table this service persisted itself; such reloads are timed as the
+    "reload" stage instead of "parse" and counted under their own label.
+    Raises IngestionError listing missing columns or invalid rows.
+    """
+    with stage("parse" if source == "upload" else "reload"):
+        table = _parse_table(upload, schema, filename)
+    ROWS_PROCESSED.inc(len(table), table=schema.name, source=source)
+    return table
+
+
+def _parse_table(upload, schema, filename):
+    filename = (filename or getattr(upload, "filename", None) or "").lower()
+    stream = getattr(upload, "file", upload)
+    chunks_iter = _iter_excel_chunks(stream) if filename.endswith(EXCEL_EXTENSIONS) else _iter_csv_chunks(stream)
+
+    chunks, errors = [], []
+    first_row, error_count = 1, 0
+    try:
+        for chunk in chunks_iter:
+            chunk.columns = [str(column).strip() for column in chunk.columns]
+            if not chunks:
+                missing = [column for column in schema.required if column not in chunk.columns]
+                if missing:
+                    raise IngestionError(schema.name, [f"missing required column(s): {', '.join(missing)}"])
+            error_count += _typed_chunk(chunk, schema, first_row, errors)
+            chunks.append(chunk)
+            first_row += len(chunk)
+    except pd.errors.EmptyDataError:
+        raise IngestionError(schema.name, ["file is empty"])
+    except pd.errors.ParserError as e:
+        raise IngestionError(schema.name, [str(e).strip()])
+    except UnicodeDecodeError:
+        raise IngestionError(schema.name, ["file is not valid UTF-8"])
+    finally:
+        # Release the parser while the caller's stream is still open.
+        chunks_iter.close()
+
+    if error_count:
+        raise IngestionError(schema.name, errors, error_count)
+    if not chunks:
+        raise IngestionError(schema.name, ["file has no header row"])
+
+    table = pd.concat(chunks, ignore_index=True)
+    # Chunks carry their own categories; union them instead of falling back to object.
+    for column in schema.categorical:
+        if column in table.columns:
+            table[column] = union_categoricals([chunk[column] for chunk in chunks])
+    return table
+
@@ -0,0 +1,211 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from catalog import CatalogStore
+from ingestion import CANDIDATE_SCHEMA, INTERNSHIP_SCHEMA, read_table
+
+COPY_CHUNK_BYTES = 1 << 20
+TERMINAL_STATES = ("completed", "failed", "cancelled")
+
+
+class JobQueueFull(RuntimeError):
+    """ Raised when too many jobs are already queued or running. """
+
+
+class JobNotFound(KeyError):
+    """ Raised for unknown (or already pruned) job ids. """
+
+
+class JobCancelled(Exception):
+    """ Raised inside a worker when its job has been cancelled. """
+
+
+def _run_allocation(job_id, shared, candidates_path, internships_path, catalog_root, catalog_id, strategy):
+    # Imported here so worker processes only load the recommender when they run a job.
+    from main import InternshipRecommender, RecommendationConfig
+
+    def progress(**counts):
+        if shared.get((job_id, "cancel")):
+            raise JobCancelled()
+        for name, value in counts.items():
+            shared[(job_id, name)] = value
+
+    progress(stage="parsing")
+    with open(candidates_path, "rb") as f:
+        candidates_df = read_table(f, CANDIDATE_SCHEMA, filename=candidates_path)
+    index = internships_df = None
+    if catalog_id:
+        index = CatalogStore(catalog_root).get(catalog_id)
+    else:
+        with open(internships_path, "rb") as f:
+            internships_df = read_table(f, INTERNSHIP_SCHEMA, filename=internships_path)
+
+    progress(stage="allocating", total=len(candidates_df))
+    recommender = InternshipRecommender(RecommendationConfig())
+    allocations = recommender.recommend(candidates_df, internships_df, strategy, index=index, progress=progress)
+    progress(stage="completed", scored=len(candidates_df), assigned=len(allocations))
+    return allocations
+
+
+class Job:
+    def __init__(self, job_id, workdir, strategy, catalog_id):
+        self.job_id = job_id
+        self.workdir = workdir
+        self.strategy = strategy
+        self.catalog_id = catalog_id
+        self.status = "queued"
+        self.error = None
+        self.result = None
+        self.future = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+
+class JobManager:
+    """
+    Runs allocations in a bounded ProcessPoolExecutor, off the event loop.
+
+    Uploads are spooled to a per-job temporary directory and parsed inside
+    the worker. Workers publish progress (and poll for cancellation) through
+    a multiprocessing Manager dict. At most `max_pending` jobs may be queued
+    or running; beyond that `submit` raises JobQueueFull. Only the newest
+    `max_retained` finished jobs are kept. Job state lives in the process
+    that accepted the job, so multi-worker deployments need sticky routing
+    for /jobs.
+    """
+
+    def __init__(self, catalog_root, max_workers=2, max_pending=8, max_retained=50):
+        self.catalog_root = catalog_root
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_retained = max_retained
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._shared = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._manager = multiprocessing.Manager()
+            self._shared = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def shutdown(self):
+        if self._executor is not None:
+            # Ask running jobs to stop at their next progress update and wait for
+            # the workers to exit before the Manager goes away: a worker still
+            # unpickling its call needs the Manager to rebuild the shared dict.
+            with self._lock:
+                unfinished = [job_id for job_id, job in self._jobs.items() if job.status not in TERMINAL_STATES]
+            for job_id in unfinished:
+                self._shared[(job_id, "cancel")] = True
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = self._manager = self._shared = None
+
+    def pending(self):
+        return sum(job.status in ("queued", "running") for job in self._jobs.values())
+
+    def submit(self, candidates, internships=None, catalog_id=None, strategy=None):
+        """ Spools the uploads to disk and queues an allocation; returns the Job. """
+        with self._lock:
+            if self.pending() >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} allocation jobs are already queued or running.")
+            self._ensure_started()
+            job = Job(uuid.uuid4().hex, tempfile.mkdtemp(prefix="allocation-job-"), strategy, catalog_id)
+            self._jobs[job.job_id] = job
+
+        try:
+            candidates_path = self._spool(candidates, job.workdir, "candidates")
+            internships_path = self._spool(internships, job.workdir, "internships") if internships else None
+            args = (job.job_id, self._shared, candidates_path, internships_path, self.catalog_root, catalog_id, strategy)
+            try:
+                job.future = self._executor.submit(_run_allocation, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool for new jobs.
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                job.future = self._executor.submit(_run_allocation, *args)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+            shutil.rmtree(job.workdir, ignore_errors=True)
+            raise
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        self._prune()
+        return job
+
+    @staticmethod
+    def _spool(upload, workdir, name):
+        extension = os.path.splitext(upload.filename or "")[1].lower()
+        path = os.path.join(workdir, name + extension)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(upload.file, f, COPY_CHUNK_BYTES)
+        return path
+
+    def _finish(self, job, future):
+        try:
+            job.result = future.result()
+            job.status = "completed"
+        except (CancelledError, JobCancelled):
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = time.time()
+        shutil.rmtree(job.workdir, ignore_errors=True)
+
+    def _prune(self):
+        with self._lock:
+            finished = sorted((job for job in self._jobs.values() if job.status in TERMINAL_STATES),
+                              key=lambda job: job.finished_at)
+            for job in finished[:max(0, len(finished) - self.max_retained)]:
+                del self._jobs[job.job_id]
+                self._forget_progress(job.job_id)
+
+    def _forget_progress(self, job_id):
+        for key in [key for key in self._shared.keys() if key[0] == job_id]:
+            self._shared.pop(key, None)
+
+    def get(self, job_id):
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            raise JobNotFound(job_id)
+
+    def status(self, job_id):
+        job = self.get(job_id)
+        progress = {name: self._shared.get((job_id, name)) for name in ("stage", "total", "scored", "assigned")}
+        if job.status == "queued" and progress["stage"] is not None:
+            job.status = "running"
+        return {
+            "job_id": job.job_id,
+            "status": job.status,
+            "strategy": job.strategy,
+            "catalog_id": job.catalog_id,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+            "progress": {
+                "stage": progress["stage"],
+                "candidates_total": progress["total"],
+                "candidates_scored": progress["scored"] or 0,
+                "candidates_assigned": progress["assigned"] or 0,
+            },
+            "error": job.error,
+        }
+
+    def cancel(self, job_id):
+        """ Cancels a queued job immediately or asks a running one to stop. """
+        job = self.get(job_id)
+        if job.status in TERMINAL_STATES:
+            return job
+        if not job.future.cancel():
+            self._shared[(job_id, "cancel")] = True
+        return job
@@ -1,11 +1,31 @@
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Union
+
 import pandas as pd
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from pydantic import BaseModel
-import io
 import numpy as np
+from scoring import ScoringEngine, format_reason, text_column
+from assignment import DenseScores, STRATEGIES, get_strategy
+from ingestion import CANDIDATE_SCHEMA, INTERNSHIP_SCHEMA, IngestionError, read_table
+from catalog import CatalogNotFound, CatalogStore
+from jobs import JobManager, JobNotFound, JobQueueFull
+from snapshots import AllocationSnapshot, SnapshotInputError, SnapshotNotFound, SnapshotStore
+from query import get_query_index
+from serialization import (COLUMNAR_AVAILABLE, COLUMNAR_FORMATS, MEDIA_TYPES, OUTPUT_FORMATS, columnar_bytes,
+                           dumps, iter_records, ndjson_batches)
+import metrics
+from metrics import stage
+
+logger = logging.getLogger(__name__)
 
 # --- Configuration ---
 class RecommendationConfig:
@@ -16,6 +36,23 @@ class RecommendationConfig:
     RURAL_BONUS = 0.05
     CATEGORY_BONUS = 0.05
     PAST_INTERNSHIP_PENALTY = 0.1
+    # "corpus" fits one TF-IDF model per field over the whole upload and scores
+    # all pairs with sparse matrix products; "pairwise" reproduces the original
+    # per-pair TF-IDF scores (see InternshipRecommender._base_score).
+    SCORING_MODE = "corpus"
+    # Allocation strategy used when the request does not name one (see assignment.STRATEGIES)
+    # and the number of best internships per candidate the optimal solver considers.
+    ALLOCATION_STRATEGY = "greedy"
+    ALLOCATION_TOP_K = 50
+
+def candidate_ids(candidates_df):
+    """ Candidate ids as strings; snapshots and re-allocation need a unique `id` column. """
+    if 'id' not in candidates_df:
+        raise SnapshotInputError("Candidates need an 'id' column for snapshots and re-allocation.")
+    ids = text_column(candidates_df, 'id').to_numpy()
+    if len(set(ids)) != len(ids):
+        raise SnapshotInputError("Candidate ids must be unique for snapshots and re-allocation.")
+    return ids
 
 # --- Recommender Logic ---
 class InternshipRecommender:
@@ -35,67 +72,250 @@ class InternshipRecommender:
         except Exception:
             return 0.0
 
-    def _calculate_score(self, candidate, internship):
+    def _base_score(self, candidate, internship):
+        """ Weighted similarity of a candidate and an internship, before bonuses and penalties. """
         skills_score = self._calculate_similarity(candidate.get('skills', ''), internship.get('required_skills', ''))
         qual_score = self._calculate_similarity(candidate.get('qualifications', ''), internship.get('qualifications', ''))
         loc_score = 1 if str(candidate.get('location_preferences', '')).lower() == str(internship.get('location', '')).lower() else 0
         interests_score = self._calculate_similarity(candidate.get('sector_interests', ''), internship.get('sector', ''))
 
-        base_score = (skills_score * self.config.SKILLS_WEIGHT +
-                      qual_score * self.config.QUALIFICATIONS_WEIGHT +
-                      loc_score * self.config.LOCATION_WEIGHT +
-                      interests_score * self.config.INTERESTS_WEIGHT)
-
-        # Apply bonuses and penalties
-        reason = f"Base score ({base_score:.2f}) from skills, qualifications, location, and interests."
-        if str(candidate.get('category', '')).strip().lower() == 'rural':
-            base_score += self.config.RURAL_BONUS
-            reason += f" Rural bonus (+{self.config.RURAL_BONUS}) applied."
-        if str(candidate.get('past_internship', '')).strip().lower() == 'true':
-            base_score -= self.config.PAST_INTERNSHIP_PENALTY
-            reason += f" Past internship penalty (-{self.config.PAST_INTERNSHIP_PENALTY}) applied."
-        
-        final_score = np.clip(base_score, 0, 1)
-        
-        return final_score, reason
+        return (skills_score * self.config.SKILLS_WEIGHT +
+                qual_score * self.config.QUALIFICATIONS_WEIGHT +
+                loc_score * self.config.LOCATION_WEIGHT +
+                interests_score * self.config.INTERESTS_WEIGHT)
 
-    def recommend(self, candidates_df, internships_df):
-        allocations = []
-        available_internships = internships_df.copy()
-        
-        # Ensure capacity is a numeric type, filling non-numeric with 0
-        available_internships['capacity'] = pd.to_numeric(available_internships['capacity'], errors='coerce').fillna(0).astype(int)
-
-        for _, candidate in candidates_df.iterrows():
-            scores = []
-            for _, internship in available_internships.iterrows():
-                if internship['capacity'] > 0:
-                    score, reason = self._calculate_score(candidate, internship)
-                    scores.append((score, reason, internship))
-            
-            if scores:
-                scores.sort(key=lambda x: x[0], reverse=True)
-                best_score, best_reason, best_internship = scores[0]
-                
-                allocations.append({
-                    "Candidate": candidate['name'],
-                    "Internship": best_internship['title'],
-                    "Score": best_score,
-                    "Reason": best_reason,
-                    "Category": candidate.get('category', 'N/A'),
-                    "Location": best_internship.get('location', 'N/A')
-                })
-                
-                internship_idx = available_internships.index[available_internships['id'] == best_internship['id']]
-                available_internships.loc[internship_idx, 'capacity'] -= 1
-
-        return sorted(allocations, key=lambda x: x['Score'], reverse=True)
+    @staticmethod
+    def _candidate_flags(candidate):
+        """ Whether the rural bonus and the past internship penalty apply to a candidate. """
+        return (str(candidate.get('category', '')).strip().lower() == 'rural',
+                str(candidate.get('past_internship', '')).strip().lower() == 'true')
+
+    def _score_source(self, candidates_df, internships_df, index=None):
+        """ Returns the candidates x internships score source and a callback explaining (rows, cols) pairs. """
+        if self.config.SCORING_MODE == "pairwise":
+            candidates = candidates_df.to_dict('records')
+            internships = internships_df.to_dict('records')
+            with stage("score"):
+                base = np.reshape([[self._base_score(candidate, internship) for internship in internships]
+                                   for candidate in candidates], (len(candidates), len(internships)))
+                flags = np.array([self._candidate_flags(candidate) for candidate in candidates], dtype=bool).reshape(-1, 2)
+                scores = base.copy()
+                scores[flags[:, 0]] += self.config.RURAL_BONUS
+                scores[flags[:, 1]] -= self.config.PAST_INTERNSHIP_PENALTY
+            # Reasons are only built for the pairs that end up assigned.
+            explain = lambda rows, cols: [format_reason(self.config, base[i, j], *flags[i]) for i, j in zip(rows, cols)]
+            return DenseScores(np.clip(scores, 0, 1)), explain
+
+        engine = ScoringEngine(self.config)
+        if index is not None:
+            engine.fit_index(index, candidates_df)
+        else:
+            engine.fit(candidates_df, internships_df)
+        return engine, engine.explain
+
+    def allocate(self, candidates_df, internships_df=None, strategy=None, index=None, progress=None, capacity=None):
+        """
+        Runs an allocation strategy. Returns, per candidate, the assigned
+        internship position (-1 if none), its score (NaN if none) and reason.
+        `capacity` overrides the internships' capacity column.
+        """
+        strategy = get_strategy(strategy or self.config.ALLOCATION_STRATEGY, self.config,
+                                progress or (lambda **counts: None))
+        if index is not None:
+            internships_df = index.table
+
+        if capacity is None:
+            # Ensure capacity is a numeric type, filling non-numeric with 0
+            capacity = pd.to_numeric(internships_df['capacity'], errors='coerce').fillna(0).astype(int).to_numpy()
+
+        source, explain = self._score_source(candidates_df, internships_df, index)
+        with stage("assign"):
+            assignment = strategy.assign(source, capacity)
+        scores, reasons = self.describe(source, explain, assignment)
+        return assignment, scores, reasons
+
+    @staticmethod
+    @stage("explain")
+    def describe(source, explain, assignment):
+        """ Scores (NaN if unassigned) and reasons (None if unassigned) of the assigned pairs only. """
+        candidate_rows = np.flatnonzero(assignment >= 0)
+        scores = np.full(len(assignment), np.nan)
+        scores[candidate_rows] = source.pair_scores(candidate_rows, assignment[candidate_rows])
+        reasons = [None] * len(assignment)
+        for candidate_pos, reason in zip(candidate_rows, explain(candidate_rows, assignment[candidate_rows])):
+            reasons[candidate_pos] = reason
+        return scores, reasons
+
+    @staticmethod
+    @stage("format")
+    def allocation_columns(candidates_df, internships_df, assignment, scores, reasons):
+        """
+        The API's allocation records as columns of plain Python values, one
+        entry per assigned candidate, by descending score (ties keep file order).
+        """
+        candidate_rows = np.flatnonzero(assignment >= 0)
+        candidate_rows = candidate_rows[np.argsort(-scores[candidate_rows], kind="stable")]
+        internship_rows = assignment[candidate_rows]
+        not_available = ['N/A'] * len(candidate_rows)
+        return {
+            "Candidate": candidates_df['name'].to_numpy()[candidate_rows].tolist(),
+            "Internship": internships_df['title'].to_numpy()[internship_rows].tolist(),
+            "Score": scores[candidate_rows].tolist(),
+            "Reason": [reasons[candidate_pos] for candidate_pos in candidate_rows],
+            "Category": (candidates_df['category'].to_numpy()[candidate_rows].tolist()
+                         if 'category' in candidates_df else not_available),
+            "Location": (internships_df['location'].to_numpy()[internship_rows].tolist()
+                         if 'location' in internships_df else not_available),
+        }
+
+    def format_allocations(self, candidates_df, internships_df, assignment, scores, reasons):
+        """ Turns per-candidate allocate() results into the API's allocation records. """
+        return list(iter_records(self.allocation_columns(candidates_df, internships_df, assignment, scores, reasons)))
+
+    def recommend(self, candidates_df, internships_df=None, strategy=None, index=None, progress=None):
+        """
+        Allocates candidates to internships. The internship side is either a
+        DataFrame or a prebuilt InternshipIndex (e.g. from the catalog store).
+        `progress`, if given, receives running scored/assigned candidate counts.
+        """
+        if index is not None:
+            internships_df = index.table
+        assignment, scores, reasons = self.allocate(candidates_df, internships_df, strategy, index, progress)
+        return self.format_allocations(candidates_df, internships_df, assignment, scores, reasons)
+
+    def reallocate(self, snapshot, index, added_df=None, removed_ids=(), capacity_changes=None, strategy=None):
+        """
+        Repairs a previous allocation after a delta instead of re-solving it.
+
+        Withdrawn candidates free their seats, internships whose capacity drops
+        below their current load release their lowest-scoring candidates, and
+        only the candidates left without a seat (released, previously
+        unassigned and newly added ones) are scored and allocated into the
+        remaining capacity. Everyone else keeps their seat and stored score.
+        Returns the new AllocationSnapshot and the list of changed allocations.
+        """
+        strategy = strategy or snapshot.strategy
+        titles = index.table['title'].to_numpy()
+        internship_ids = text_column(index.table, 'id').to_numpy()
+
+        old_ids = candidate_ids(snapshot.candidates)
+        removed_ids = set(removed_ids)
+        unknown = removed_ids - set(old_ids)
+        if unknown:
+            raise SnapshotInputError(f"Unknown candidate id(s): {', '.join(sorted(unknown))}")
+        keep = ~np.isin(old_ids, list(removed_ids))
+
+        candidates_df = snapshot.candidates[keep]
+        assignment = snapshot.assignment[keep].copy()
+        scores = snapshot.scores[keep].copy()
+        reasons = [reason for reason, kept in zip(snapshot.reasons, keep) if kept]
+
+        capacity = snapshot.capacity.copy()
+        for internship_id, value in (capacity_changes or {}).items():
+            positions = np.flatnonzero(internship_ids == str(internship_id))
+            if not len(positions):
+                raise SnapshotInputError(f"Unknown internship id: {internship_id}")
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise SnapshotInputError(f"Capacity of internship {internship_id} must be a non-negative integer.")
+            capacity[positions] = value
+
+        # Release the lowest-scoring candidates of internships that are now over capacity.
+        load = np.bincount(assignment[assignment >= 0], minlength=len(capacity))
+        for internship_pos in np.flatnonzero(load > np.maximum(capacity, 0)):
+            holders = np.flatnonzero(assignment == internship_pos)
+            released = holders[np.argsort(scores[holders], kind='stable')[:load[internship_pos] - max(capacity[internship_pos], 0)]]
+            assignment[released] = -1
+            scores[released] = np.nan
+            for candidate_pos in released:
+                reasons[candidate_pos] = None
+
+        if added_df is not None and len(added_df):
+            duplicates = set(candidate_ids(added_df)) & set(candidate_ids(candidates_df))
+            if duplicates:
+                raise SnapshotInputError(f"Candidate id(s) already allocated: {', '.join(sorted(duplicates))}")
+            candidates_df = pd.concat([candidates_df, added_df], ignore_index=True)
+            for column in CANDIDATE_SCHEMA.categorical:
+                if column in candidates_df:
+                    # Rows from a file without this column come back as NaN; store them as ''.
+                    candidates_df[column] = candidates_df[column].astype(object).fillna('').astype('category')
+            assignment = np.concatenate([assignment, np.full(len(added_df), -1)])
+            scores = np.concatenate([scores, np.full(len(added_df), np.nan)])
+            reasons = reasons + [None] * len(added_df)
+        candidates_df = candidates_df.reset_index(drop=True)
+
+        to_place = np.flatnonzero(assignment < 0)
+        remaining = capacity - np.bincount(assignment[assignment >= 0], minlength=len(capacity))
+        if len(to_place) and (remaining > 0).any():
+            placed, placed_scores, placed_reasons = self.allocate(
+                candidates_df.iloc[to_place].reset_index(drop=True), strategy=strategy, index=index, capacity=remaining)
+            assignment[to_place] = placed
+            scores[to_place] = placed_scores
+            for candidate_pos, reason in zip(to_place, placed_reasons):
+                reasons[candidate_pos] = reason
+
+        before = dict(zip(old_ids, snapshot.assignment))
+        after = dict(zip(candidate_ids(candidates_df), assignment))
+        changes = []
+        for candidate_id in list(before) + [candidate_id for candidate_id in after if candidate_id not in before]:
+            old, new = before.get(candidate_id, -1), after.get(candidate_id, -1)
+            if candidate_id not in after:
+                change = "withdrawn"
+            elif candidate_id not in before:
+                change = "added"
+            elif old == new:
+                continue
+            else:
+                change = "moved" if old >= 0 and new >= 0 else ("assigned" if new >= 0 else "unassigned")
+            changes.append({
+                "candidate_id": candidate_id,
+                "change": change,
+                "before": titles[old] if old >= 0 else None,
+                "after": titles[new] if new >= 0 else None,
+            })
+
+        new_snapshot = AllocationSnapshot(snapshot.catalog_id, strategy, candidates_df, capacity,
+                                          assignment, scores, reasons, parent_id=snapshot.snapshot_id)
+        return new_snapshot, changes
+
+# --- Internship Catalog ---
+# Uploaded internship sets are indexed once and reused by /allocate?catalog_id=...
+# Point CATALOG_DIR at shared storage so every uvicorn worker sees the same catalogs.
+catalog_store = CatalogStore(
+    os.environ.get("CATALOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogs")),
+    max_loaded=int(os.environ.get("CATALOG_MAX_LOADED", 4)),
+    max_versions=int(os.environ.get("CATALOG_MAX_VERSIONS", 20)),
+)
+
+# --- Allocation Snapshots ---
+# Results of /allocate?snapshot=true, the starting point for incremental /reallocate runs.
+snapshot_store = SnapshotStore(
+    os.environ.get("SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")),
+    max_snapshots=int(os.environ.get("SNAPSHOT_MAX", 100)),
+)
+
+# --- Allocation Jobs ---
+# Large allocations run in a bounded process pool so they never block the event loop.
+job_manager = JobManager(
+    catalog_store.root,
+    max_workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("JOB_MAX_PENDING", 8)),
+    max_retained=int(os.environ.get("JOB_MAX_RETAINED", 50)),
+)
+JOB_RETRY_AFTER_SECONDS = 30
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm the most recently used catalogs so the first request does not pay for loading them.
+    catalog_store.warm(int(os.environ.get("CATALOG_WARM", 1)))
+    yield
+    job_manager.shutdown()
 
 # --- FastAPI App ---
 app = FastAPI(
     title="AI-Based Smart Allocation Engine",
     description="An API for allocating candidates to internships based on skills and other criteria.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- CORS Configuration ---
@@ -117,38 +337,309 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods (GET, POST, etc.)
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["Server-Timing", "X-Snapshot-Id"],
 )
 
+# --- Instrumentation ---
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Records request latency and per-stage timings, and reports them in a
+    Server-Timing header. Metrics are recorded once the body has been sent, so
+    streamed (NDJSON) responses include the batches encoded while streaming;
+    the header goes out first and only covers the time until the response starts.
+    """
+    stages = metrics.start_request()
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+
+    def finish(status):
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, method=request.method,
+                                        path=route.path if route else "unmatched", status=status)
+        metrics.finish_request(stages)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish(500)
+        raise
+    response.headers["Server-Timing"] = metrics.server_timing(stages, time.perf_counter() - start)
+    body = response.body_iterator
+
+    async def send_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish(response.status_code)
+
+    response.body_iterator = send_body()
+    return response
+
 class AllocationResponse(BaseModel):
     allocations: list
+    snapshot_id: Optional[str] = None
+
+class CandidateProfile(BaseModel):
+    name: str = ""
+    skills: str = ""
+    qualifications: str = ""
+    location_preferences: str = ""
+    sector_interests: str = ""
+    category: str = ""
+    past_internship: Union[bool, str] = ""
+
+class ReallocationResponse(BaseModel):
+    allocations: list
+    snapshot_id: str
+    changes: list
 
 @app.get("/")
 def read_root():
     """ A simple endpoint to confirm the API is running. """
     return {"message": "AI-Based Smart Allocation Engine Backend is active"}
 
-@app.post("/allocate", response_model=AllocationResponse)
-async def create_allocations(candidates: UploadFile = File(...), internships: UploadFile = File(...)):
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """ Request, stage and throughput metrics of this worker in the Prometheus text format. """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def _check_allocation_request(internships, catalog_id, strategy):
+    """ Validates the options shared by /allocate and /jobs. """
+    if strategy not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown allocation strategy '{strategy}'. Available: {', '.join(STRATEGIES)}")
+    if (internships is None) == (catalog_id is None):
+        raise HTTPException(status_code=400, detail="Provide either an internships file or a catalog_id.")
+
+def _timed_batches(batches):
+    """ Times the encoding of each streamed batch as the serialize stage. """
+    # Batches are pulled one at a time from a thread pool, so each one gets its own stage block.
+    batches = iter(batches)
+    while True:
+        with stage("serialize"):
+            batch = next(batches, None)
+        if batch is None:
+            return
+        yield batch
+
+def _allocation_response(columns, output, snapshot_id=None):
+    """
+    Encodes allocation columns in the requested output format. The response
+    is built directly, skipping response-model validation of every record;
+    NDJSON is streamed in batches while it is being encoded.
     """
-    This endpoint receives candidate and internship data (as CSV files),
+    headers = {"X-Snapshot-Id": snapshot_id} if snapshot_id else {}
+    if output == "ndjson":
+        return StreamingResponse(_timed_batches(ndjson_batches(columns)), media_type=MEDIA_TYPES[output],
+                                 headers=headers)
+    with stage("serialize"):
+        if output in COLUMNAR_FORMATS:
+            content = columnar_bytes(columns, output)
+            headers["Content-Disposition"] = f'attachment; filename="allocations.{output}"'
+        else:
+            body = {"allocations": list(iter_records(columns))}
+            if snapshot_id:
+                body["snapshot_id"] = snapshot_id
+            content = dumps(body)
+    return Response(content, media_type=MEDIA_TYPES[output], headers=headers)
+
+@app.post("/allocate", response_model=AllocationResponse, response_model_exclude_none=True)
+@metrics.profile_if_slow("allocate")
+def create_allocations(candidates: UploadFile = File(...), internships: Optional[UploadFile] = File(None),
+                       strategy: str = RecommendationConfig.ALLOCATION_STRATEGY,
+                       catalog_id: Optional[str] = None, snapshot: bool = False,
+                       output: str = Query("json", alias="format")):
+    """
+    This endpoint receives candidate and internship data (as CSV or Excel files),
     and returns a list of recommended allocations.
+    Instead of an internships file, a `catalog_id` from POST /catalogs can be given.
+    The optional `strategy` query parameter selects the allocation strategy
+    ("greedy" in file order, or "optimal" for the best total score).
+    With `snapshot=true` the result is stored (the internships file is added
+    to the catalogs) and its `snapshot_id` can be passed to /reallocate.
+    `format` selects the response encoding: "json" (default), "ndjson" (one
+    allocation per line, streamed; the snapshot id is sent in X-Snapshot-Id),
+    or a "parquet" / "arrow" file download when pyarrow is installed.
+    This is the synchronous path for small uploads; use POST /jobs for large ones.
     """
+    _check_allocation_request(internships, catalog_id, strategy)
+    if output not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown output format '{output}'. Available: {', '.join(OUTPUT_FORMATS)}")
+    if output in COLUMNAR_FORMATS and not COLUMNAR_AVAILABLE:
+        raise HTTPException(status_code=501, detail=f"The {output} format requires pyarrow, which is not installed on the server.")
     try:
-        # Read the uploaded files
-        candidates_content = await candidates.read()
-        internships_content = await internships.read()
-        
-        # Convert file content to pandas DataFrames
-        candidates_df = pd.read_csv(io.StringIO(candidates_content.decode('utf-8'))).fillna('')
-        internships_df = pd.read_csv(io.StringIO(internships_content.decode('utf-8'))).fillna('')
+        # Parse the uploaded files straight from their spooled streams
+        candidates_df = read_table(candidates, CANDIDATE_SCHEMA)
+        if snapshot:
+            candidate_ids(candidates_df)
+            if catalog_id is None:
+                catalog_id = catalog_store.put(internships)[0]["catalog_id"]
+        index = catalog_store.get(catalog_id) if catalog_id else None
+        internships_df = read_table(internships, INTERNSHIP_SCHEMA) if index is None else index.table
         
         # Initialize the recommender and get allocations
         config = RecommendationConfig()
         recommender = InternshipRecommender(config)
-        
-        allocations = recommender.recommend(candidates_df, internships_df)
-        
-        return {"allocations": allocations}
-    except Exception as e:
-        # If any error occurs, return a 500 error with details
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+        assignment, scores, reasons = recommender.allocate(candidates_df, internships_df, strategy, index=index)
+
+        snapshot_id = None
+        if snapshot:
+            capacity = internships_df['capacity'].to_numpy()
+            snapshot_id = snapshot_store.save(AllocationSnapshot(
+                catalog_id, strategy, candidates_df, capacity, assignment, scores, reasons))
+        columns = recommender.allocation_columns(candidates_df, internships_df, assignment, scores, reasons)
+        return _allocation_response(columns, output, snapshot_id)
+    except CatalogNotFound:
+        raise HTTPException(status_code=404, detail=f"Catalog '{catalog_id}' not found.")
+    except (IngestionError, SnapshotInputError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        # Unexpected failures are logged with their traceback and counted; the client gets a generic 500.
+        logger.exception("Allocation failed")
+        metrics.ALLOCATION_FAILURES.inc(endpoint="allocate")
+        raise HTTPException(status_code=500, detail="Allocation failed due to an internal error.")
+
+@app.post("/reallocate", response_model=ReallocationResponse)
+@metrics.profile_if_slow("reallocate")
+def reallocate(snapshot_id: str, added: Optional[UploadFile] = File(None),
+               removed: Optional[str] = Form(None), capacity: Optional[str] = Form(None),
+               strategy: Optional[str] = None):
+    """
+    Incrementally updates a stored allocation instead of recomputing it.
+    `added` is a candidates file of new applicants, `removed` a comma-separated
+    list of withdrawn candidate ids and `capacity` a JSON object mapping
+    internship ids to their new capacity. Only candidates without a seat are
+    scored; the response lists the allocations that changed.
+    """
+    if strategy is not None and strategy not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown allocation strategy '{strategy}'. Available: {', '.join(STRATEGIES)}")
+    try:
+        capacity_changes = json.loads(capacity) if capacity else {}
+        if not isinstance(capacity_changes, dict):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="capacity must be a JSON object of internship id to capacity.")
+    removed_ids = [candidate_id.strip() for candidate_id in (removed or "").split(",") if candidate_id.strip()]
+
+    try:
+        previous = snapshot_store.load(snapshot_id)
+        index = catalog_store.get(previous.catalog_id)
+        added_df = read_table(added, CANDIDATE_SCHEMA) if added is not None else None
+
+        recommender = InternshipRecommender(RecommendationConfig())
+        updated, changes = recommender.reallocate(previous, index, added_df, removed_ids, capacity_changes, strategy)
+        new_snapshot_id = snapshot_store.save(updated)
+        allocations = recommender.format_allocations(
+            updated.candidates, index.table, updated.assignment, updated.scores, updated.reasons)
+        return {"allocations": allocations, "snapshot_id": new_snapshot_id, "changes": changes}
+    except SnapshotNotFound:
+        raise HTTPException(status_code=404, detail=f"Snapshot '{snapshot_id}' not found.")
+    except CatalogNotFound:
+        raise HTTPException(status_code=404, detail="The snapshot's catalog is no longer available.")
+    except (IngestionError, SnapshotInputError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        logger.exception("Re-allocation failed")
+        metrics.ALLOCATION_FAILURES.inc(endpoint="reallocate")
+        raise HTTPException(status_code=500, detail="Re-allocation failed due to an internal error.")
+
+@app.post("/catalogs")
+def create_catalog(internships: UploadFile = File(...)):
+    """
+    Stores an internship file as a reusable catalog, keyed by its content hash.
+    Uploading the same content again returns the existing catalog.
+    """
+    try:
+        manifest, created = catalog_store.put(internships)
+    except IngestionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**manifest, "created": created}
+
+@app.get("/catalogs")
+def list_catalogs():
+    """ Lists stored catalogs, most recently used first. """
+    return {"catalogs": catalog_store.list()}
+
+@app.get("/catalogs/{catalog_id}")
+def get_catalog(catalog_id: str):
+    try:
+        return catalog_store.manifest(catalog_id)
+    except CatalogNotFound:
+        raise HTTPException(status_code=404, detail=f"Catalog '{catalog_id}' not found.")
+
+@app.post("/catalogs/{catalog_id}/recommend")
+def recommend_for_candidate(catalog_id: str, candidate: CandidateProfile, k: int = Query(10, ge=1, le=100)):
+    """
+    Returns the top-k open internships of a catalog for a single candidate,
+    with the score breakdown of each. Only internships sharing a skill,
+    qualification or sector term (or the preferred location) are scored.
+    """
+    try:
+        index = catalog_store.get(catalog_id)
+    except CatalogNotFound:
+        raise HTTPException(status_code=404, detail=f"Catalog '{catalog_id}' not found.")
+    query_index = get_query_index(index, RecommendationConfig())
+    return {"catalog_id": catalog_id, "recommendations": query_index.recommend(candidate.model_dump(), k)}
+
+@app.delete("/catalogs/{catalog_id}")
+def delete_catalog(catalog_id: str):
+    try:
+        catalog_store.delete(catalog_id)
+    except CatalogNotFound:
+        raise HTTPException(status_code=404, detail=f"Catalog '{catalog_id}' not found.")
+    return {"deleted": catalog_id}
+
+@app.post("/jobs", status_code=202)
+def submit_job(candidates: UploadFile = File(...), internships: Optional[UploadFile] = File(None),
+               strategy: str = RecommendationConfig.ALLOCATION_STRATEGY,
+               catalog_id: Optional[str] = None):
+    """
+    Queues an allocation with the same inputs as /allocate and returns its job id.
+    Responds 429 when the job queue is full.
+    """
+    _check_allocation_request(internships, catalog_id, strategy)
+    if catalog_id:
+        try:
+            catalog_store.manifest(catalog_id)
+        except CatalogNotFound:
+            raise HTTPException(status_code=404, detail=f"Catalog '{catalog_id}' not found.")
+    try:
+        job = job_manager.submit(candidates, internships, catalog_id, strategy)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+    return job_manager.status(job.job_id)
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """ Job status and progress (candidates scored and assigned so far). """
+    try:
+        return job_manager.status(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    try:
+        job_manager.cancel(job_id)
+        return job_manager.status(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+
+@app.get("/jobs/{job_id}/results")
+def get_job_results(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=10000)):
+    """ A page of a completed job's allocations, in the same order as /allocate. """
+    try:
+        job = job_manager.get(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job.status}.")
+    return {
+        "job_id": job_id,
+        "total": len(job.result),
+        "offset": offset,
+        "limit": limit,
+        "allocations": job.result[offset:offset + limit],
+    }
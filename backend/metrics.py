@@ -0,0 +1,239 @@
+import contextvars
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+# Histogram buckets (seconds) shared by request and stage latencies.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), self._empty())]
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _empty(self):
+        return 0.0
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def _empty(self):
+        return [0] * len(self.buckets), 0.0
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or self._empty()
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self, key, value):
+        counts, total = value
+        lines = []
+        for bound, count in zip(self.buckets, counts):
+            le = "+Inf" if bound == math.inf else repr(float(bound))
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames + ('le',), key + (le,))} {count}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {total}")
+        lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+REGISTRY = []
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency.", ["method", "path", "status"])
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+STAGE_LATENCY = Histogram("allocation_stage_duration_seconds",
+                          "Time spent per allocation stage (exclusive of nested stages).", ["stage"])
+ROWS_PROCESSED = Counter("allocation_rows_processed_total",
+                         "Rows parsed, from uploads or from tables reloaded from disk.", ["table", "source"])
+PAIR_EVALUATIONS = Counter("allocation_pair_evaluations_total", "Candidate/internship pairs scored.")
+ALLOCATION_FAILURES = Counter("allocation_failures_total", "Allocation requests that failed unexpectedly.",
+                              ["endpoint"])
+PROFILES_WRITTEN = Counter("slow_request_profiles_total", "Profiles dumped for requests over the threshold.")
+
+
+def render():
+    """ All metrics in the Prometheus text exposition format. """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Per-request stage timings ---
+# The middleware installs a fresh dict per request; stage() adds to it. Outside
+# a request (e.g. allocation jobs) stage timings go straight to STAGE_LATENCY.
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+_stage_stack = contextvars.ContextVar("stage_stack", default=())
+
+
+def start_request():
+    stages = {}
+    _request_stages.set(stages)
+    return stages
+
+
+@contextmanager
+def stage(name):
+    """ Times a block as allocation stage `name`, excluding time spent in nested stages. """
+    frame = [0.0]  # time spent in nested stages
+    token = _stage_stack.set(_stage_stack.get() + (frame,))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _stage_stack.reset(token)
+        parents = _stage_stack.get()
+        if parents:
+            parents[-1][0] += elapsed
+        exclusive = elapsed - frame[0]
+        stages = _request_stages.get()
+        if stages is None:
+            STAGE_LATENCY.observe(exclusive, stage=name)
+        else:
+            stages[name] = stages.get(name, 0.0) + exclusive
+
+
+def finish_request(stages):
+    for name, seconds in stages.items():
+        STAGE_LATENCY.observe(seconds, stage=name)
+
+
+def server_timing(stages, total):
+    """ Server-Timing header value: one entry per stage plus the total, in milliseconds. """
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+# --- Slow request profiling ---
+class SamplingProfiler:
+    """
+    Samples the stack of one thread every `interval` seconds from a background
+    thread and aggregates them as collapsed stacks (the input format of
+    flamegraph.pl / speedscope).
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = _Tally()
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+
+    def _run(self):
+        while self._running:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# Opt-in: set PROFILE_SLOW_REQUEST_MS to profile handlers and keep the profiles
+# of those slower than the threshold in PROFILE_DIR.
+PROFILE_SLOW_REQUEST_MS = float(os.environ.get("PROFILE_SLOW_REQUEST_MS", 0))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+
+@contextmanager
+def profile_if_slow(name):
+    """ Profiles the current thread for the duration of the block when profiling is enabled. """
+    if PROFILE_SLOW_REQUEST_MS <= 0:
+        yield
+        return
+    profiler = SamplingProfiler(threading.get_ident()).start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        profiler.stop()
+        if elapsed_ms >= PROFILE_SLOW_REQUEST_MS:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump(os.path.join(PROFILE_DIR, f"{name}-{int(time.time() * 1000)}-{elapsed_ms:.0f}ms.collapsed"))
+            PROFILES_WRITTEN.inc()
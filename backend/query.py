@@ -0,0 +1,153 @@
+import threading
+import weakref
+from collections import Counter, OrderedDict
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from scoring import TEXT_FIELDS, make_count_vectorizer, smooth_idf, text_column
+
+# Distinct profiles whose results are kept per catalog.
+QUERY_CACHE_SIZE = 1024
+PROFILE_FIELDS = ("skills", "qualifications", "location_preferences", "sector_interests",
+                  "category", "past_internship")
+
+
+class _FieldPostings:
+    """ Inverted index of one text field: term -> (internship positions, TF-IDF weights). """
+
+    def __init__(self, field, n_internships):
+        self.idf = smooth_idf(np.asarray(field.document_frequency, dtype=float), n_internships)
+        # Terms the catalog has never seen still count towards the query's norm.
+        self.unseen_idf = smooth_idf(0, n_internships)
+        self.terms = {term: column for column, term in enumerate(field.vocabulary.tolist())}
+        weights = sparse.csr_matrix(field.counts.multiply(self.idf), dtype=float)
+        if weights.shape[1]:
+            weights = normalize(weights)
+        postings = weights.tocsc()
+        self.indptr, self.indices, self.data = postings.indptr, postings.indices, postings.data
+
+    def similarity(self, text, analyzer, scores, touched):
+        """ Adds the cosine similarity of `text` to every internship sharing a term into `scores`. """
+        counts = Counter(analyzer(text))
+        matched, norm = [], 0.0
+        for term, count in counts.items():
+            column = self.terms.get(term)
+            weight = count * (self.idf[column] if column is not None else self.unseen_idf)
+            norm += weight * weight
+            if column is not None:
+                matched.append((column, weight))
+        norm = np.sqrt(norm)
+        for column, weight in matched:
+            start, stop = self.indptr[column], self.indptr[column + 1]
+            rows = self.indices[start:stop]
+            scores[rows] += (weight / norm) * self.data[start:stop]
+            touched[rows] = True
+
+
+class QueryIndex:
+    """
+    Answers "best internships for this one candidate" against a catalog.
+
+    Each text field gets an inverted index built from the catalog's own
+    vocabulary and IDF weights, and locations are pre-bucketed, so a query
+    only scores internships that share a term or the preferred location.
+    Scores use the RecommendationConfig weights, bonuses and penalty; since
+    the IDF comes from the catalog alone they can differ slightly from a
+    batch /allocate run, whose IDF also covers the uploaded candidates.
+    Results for repeated profiles are served from an LRU cache.
+    """
+
+    def __init__(self, index, config, cache_size=QUERY_CACHE_SIZE):
+        self.config = config
+        self.analyzer = make_count_vectorizer().build_analyzer()
+        self.fields = [_FieldPostings(field, len(index)) for field in index.fields]
+        self.weights = np.array([getattr(config, weight_name) for _, _, weight_name in TEXT_FIELDS])
+
+        lower_locations = text_column(index.table, "location").str.lower()
+        self.location_buckets = lower_locations.groupby(lower_locations).indices
+        self.open = index.table["capacity"].to_numpy() > 0
+        self.ids = text_column(index.table, "id").to_numpy()
+        self.titles = text_column(index.table, "title").to_numpy()
+        self.organizations = text_column(index.table, "organization").to_numpy()
+        self.locations = text_column(index.table, "location").to_numpy()
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def recommend(self, profile, k=10):
+        """ Top-k open internships for a candidate record, with score breakdowns. """
+        key = (k,) + tuple(str(profile.get(field) or "").strip().lower() for field in PROFILE_FIELDS)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        results = self._search(profile, k)
+        with self._lock:
+            self._cache[key] = results
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def _search(self, profile, k):
+        n_internships = len(self.open)
+        touched = np.zeros(n_internships, dtype=bool)
+        similarities = np.zeros((len(self.fields), n_internships))
+        for field, (candidate_col, _, _), scores in zip(self.fields, TEXT_FIELDS, similarities):
+            field.similarity(str(profile.get(candidate_col) or ""), self.analyzer, scores, touched)
+
+        location_match = np.zeros(n_internships, dtype=bool)
+        bucket = self.location_buckets.get(str(profile.get("location_preferences") or "").lower())
+        if bucket is not None:
+            location_match[bucket] = True
+            touched[bucket] = True
+
+        rural = str(profile.get("category") or "").strip().lower() == "rural"
+        past_internship = str(profile.get("past_internship") or "").strip().lower() == "true"
+        adjustment = rural * self.config.RURAL_BONUS - past_internship * self.config.PAST_INTERNSHIP_PENALTY
+
+        candidates = np.flatnonzero(touched & self.open)
+        scores = (self.weights @ similarities[:, candidates]
+                  + self.config.LOCATION_WEIGHT * location_match[candidates] + adjustment)
+        scores = np.clip(scores, 0, 1)
+        if len(candidates) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(candidates))
+        best = best[np.lexsort((candidates[best], -scores[best]))]
+
+        results = []
+        for position, score in zip(candidates[best], scores[best]):
+            breakdown = {candidate_col: float(similarities[i, position])
+                         for i, (candidate_col, _, _) in enumerate(TEXT_FIELDS)}
+            breakdown["location"] = float(location_match[position])
+            breakdown["rural_bonus"] = self.config.RURAL_BONUS if rural else 0.0
+            breakdown["past_internship_penalty"] = self.config.PAST_INTERNSHIP_PENALTY if past_internship else 0.0
+            results.append({
+                "id": self.ids[position],
+                "title": self.titles[position],
+                "organization": self.organizations[position],
+                "location": self.locations[position],
+                "score": float(score),
+                "breakdown": breakdown,
+            })
+        return results
+
+
+_query_indexes = weakref.WeakKeyDictionary()
+_query_indexes_lock = threading.Lock()
+
+
+def get_query_index(index, config):
+    """
+    The QueryIndex of a (catalog) InternshipIndex, built on first use. It is
+    dropped together with the InternshipIndex when the catalog is evicted.
+    """
+    with _query_indexes_lock:
+        query_index = _query_indexes.get(index)
+        if query_index is None:
+            query_index = _query_indexes[index] = QueryIndex(index, config)
+        return query_index
@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from metrics import stage
+
+# (candidate column, internship column, config weight) for every text field
+# that is compared with TF-IDF cosine similarity.
+TEXT_FIELDS = (
+    ("skills", "required_skills", "SKILLS_WEIGHT"),
+    ("qualifications", "qualifications", "QUALIFICATIONS_WEIGHT"),
+    ("sector_interests", "sector", "INTERESTS_WEIGHT"),
+)
+
+
+def text_column(df, column):
+    """ Returns a column as strings, treating missing columns and NaN as ''. """
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[column].fillna("").astype(str)
+
+
+def flag_column(df, column, value):
+    """ Boolean mask of rows whose column equals `value` (trimmed, case-insensitive). """
+    return (text_column(df, column).str.strip().str.lower() == value).to_numpy()
+
+
+def format_reason(config, base_score, rural, past_internship):
+    """ The human-readable explanation of a score, shared by every scoring mode. """
+    reason = f"Base score ({base_score:.2f}) from skills, qualifications, location, and interests."
+    if rural:
+        reason += f" Rural bonus (+{config.RURAL_BONUS}) applied."
+    if past_internship:
+        reason += f" Past internship penalty (-{config.PAST_INTERNSHIP_PENALTY}) applied."
+    return reason
+
+
+def make_count_vectorizer():
+    """ The tokenization shared by batch scoring, catalogs and single-candidate queries. """
+    return CountVectorizer(stop_words='english')
+
+
+def _count_terms(texts):
+    """ Term counts and the (sorted) vocabulary for a list of texts. """
+    vectorizer = make_count_vectorizer()
+    try:
+        counts = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Empty vocabulary (blank column or only stop words): no terms.
+        return sparse.csr_matrix((len(texts), 0), dtype=np.int64), np.array([], dtype=str)
+    return sparse.csr_matrix(counts), vectorizer.get_feature_names_out().astype(str)
+
+
+def smooth_idf(document_frequency, n_documents):
+    """ The smoothed IDF weights TfidfVectorizer would compute for the same corpus. """
+    return np.log((1 + n_documents) / (1 + document_frequency)) + 1
+
+
+def _normalized(matrix):
+    """ L2-normalises the rows of a sparse matrix; sklearn's normalize rejects matrices without rows or columns. """
+    matrix = sparse.csr_matrix(matrix, dtype=float)
+    return normalize(matrix) if matrix.shape[0] and matrix.shape[1] else matrix
+
+
+class FieldIndex:
+    """
+    Term counts of one text field on the internship side.
+
+    Keeping raw counts and document frequencies (rather than TF-IDF weights)
+    lets candidates be merged in later and produce exactly the scores of a
+    vectorizer fitted on the whole upload.
+    """
+
+    def __init__(self, vocabulary, counts, document_frequency):
+        self.vocabulary = vocabulary
+        self.counts = counts
+        self.document_frequency = document_frequency
+
+    @classmethod
+    def build(cls, texts):
+        counts, vocabulary = _count_terms(texts)
+        return cls(vocabulary, counts, np.bincount(counts.indices, minlength=len(vocabulary)))
+
+    def merge(self, texts):
+        """ Returns L2-normalised TF-IDF matrices (texts, internships) over the combined corpus. """
+        counts, vocabulary = _count_terms(texts)
+        n_known = len(self.vocabulary)
+
+        # Map the new texts' terms onto this vocabulary, appending unseen terms at the end.
+        positions = np.searchsorted(self.vocabulary, vocabulary)
+        known = positions < n_known
+        known[known] = self.vocabulary[positions[known]] == vocabulary[known]
+        columns = np.where(known, positions, 0)
+        columns[~known] = n_known + np.arange(int((~known).sum()))
+        width = n_known + int((~known).sum())
+
+        counts = sparse.csr_matrix((counts.data, columns[counts.indices], counts.indptr), shape=(counts.shape[0], width))
+        internship_counts = sparse.csr_matrix(
+            (self.counts.data, self.counts.indices, self.counts.indptr), shape=(self.counts.shape[0], width))
+        document_frequency = np.bincount(counts.indices, minlength=width)
+        document_frequency[:n_known] += self.document_frequency
+        idf = smooth_idf(document_frequency, counts.shape[0] + internship_counts.shape[0])
+        return _normalized(counts.multiply(idf)), _normalized(internship_counts.multiply(idf))
+
+
+class InternshipIndex:
+    """ The internship side of the scoring problem, reusable across allocation runs. """
+
+    def __init__(self, table, fields, locations):
+        self.table = table
+        self.fields = fields
+        self.locations = locations
+
+    @classmethod
+    def build(cls, internships_df):
+        fields = [FieldIndex.build(text_column(internships_df, internship_col))
+                  for _, internship_col, _ in TEXT_FIELDS]
+        locations = text_column(internships_df, "location").str.lower().to_numpy(dtype=str)
+        return cls(internships_df, fields, locations)
+
+    def __len__(self):
+        return len(self.locations)
+
+
+class ScoringEngine:
+    """
+    Scores every candidate against every internship in one pass.
+
+    One TF-IDF model is fitted per text field over the whole upload (both
+    candidates and internships), so each side becomes an L2-normalised sparse
+    matrix and cosine similarity reduces to a sparse matrix product. Location
+    match, the rural bonus and the past-internship penalty are applied as
+    vectorized masks on top of the weighted similarities.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.candidate_matrices = []
+        self.internship_matrices = []
+        self.weights = []
+
+    @stage("vectorize")
+    def fit(self, candidates_df, internships_df):
+        return self.fit_index(InternshipIndex.build(internships_df), candidates_df)
+
+    @stage("vectorize")
+    def fit_index(self, index, candidates_df):
+        """ Fits against a prebuilt (possibly cached) InternshipIndex. """
+        self.candidate_matrices = []
+        self.internship_matrices = []
+        self.weights = []
+        for (candidate_col, _, weight_name), field in zip(TEXT_FIELDS, index.fields):
+            candidate_matrix, internship_matrix = field.merge(text_column(candidates_df, candidate_col))
+            self.candidate_matrices.append(candidate_matrix)
+            self.internship_matrices.append(internship_matrix)
+            self.weights.append(getattr(self.config, weight_name))
+
+        # Locations are compared as lowercase strings; factorizing both sides
+        # together turns the comparison into an integer equality check.
+        candidate_locations = text_column(candidates_df, "location_preferences").str.lower().to_numpy(dtype=str)
+        codes, _ = pd.factorize(np.concatenate([candidate_locations, index.locations]))
+        self.candidate_locations = codes[:len(candidate_locations)]
+        self.internship_locations = codes[len(candidate_locations):]
+
+        self.rural = flag_column(candidates_df, "category", "rural")
+        self.past_internship = flag_column(candidates_df, "past_internship", "true")
+        self.adjustment = (self.rural * self.config.RURAL_BONUS
+                           - self.past_internship * self.config.PAST_INTERNSHIP_PENALTY)
+        return self
+
+    @property
+    def shape(self):
+        return len(self.candidate_locations), len(self.internship_locations)
+
+    def base_scores(self, rows=slice(None)):
+        """ Weighted similarity and location scores for the selected candidate rows. """
+        block = np.zeros((len(self.candidate_locations[rows]), self.shape[1]))
+        for weight, candidate_matrix, internship_matrix in zip(
+                self.weights, self.candidate_matrices, self.internship_matrices):
+            block += weight * (candidate_matrix[rows] @ internship_matrix.T).toarray()
+        location_match = self.candidate_locations[rows, None] == self.internship_locations[None, :]
+        block += self.config.LOCATION_WEIGHT * location_match
+        return block
+
+    def scores(self, rows=slice(None)):
+        """ Final clipped scores for the selected candidate rows (a slice or an index array). """
+        block = self.base_scores(rows)
+        block += self.adjustment[rows, None]
+        return np.clip(block, 0, 1, out=block)
+
+    def pair_base_scores(self, rows, cols):
+        """ Base scores for the candidate/internship pairs (rows[n], cols[n]) only. """
+        rows, cols = np.asarray(rows, dtype=int), np.asarray(cols, dtype=int)
+        pair_scores = self.config.LOCATION_WEIGHT * (self.candidate_locations[rows] == self.internship_locations[cols])
+        for weight, candidate_matrix, internship_matrix in zip(
+                self.weights, self.candidate_matrices, self.internship_matrices):
+            similarity = candidate_matrix[rows].multiply(internship_matrix[cols]).sum(axis=1)
+            pair_scores = pair_scores + weight * np.asarray(similarity).ravel()
+        return pair_scores
+
+    def pair_scores(self, rows, cols):
+        """ Final clipped scores for the candidate/internship pairs (rows[n], cols[n]) only. """
+        return np.clip(self.pair_base_scores(rows, cols) + self.adjustment[np.asarray(rows, dtype=int)], 0, 1)
+
+    def explain(self, rows, cols):
+        """ Builds the human-readable reasons for the given candidate/internship pairs. """
+        return [format_reason(self.config, base_score, self.rural[candidate_idx], self.past_internship[candidate_idx])
+                for candidate_idx, base_score in zip(rows, self.pair_base_scores(rows, cols))]
@@ -0,0 +1,62 @@
+from itertools import islice
+
+import orjson
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Parquet / Arrow downloads are optional
+    pyarrow = None
+COLUMNAR_AVAILABLE = pyarrow is not None
+
+# Response formats of /allocate: one JSON document, newline-delimited JSON
+# streamed in batches, or a columnar file download.
+OUTPUT_FORMATS = ("json", "ndjson", "parquet", "arrow")
+COLUMNAR_FORMATS = ("parquet", "arrow")
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+# Records per chunk of a streamed NDJSON response.
+STREAM_BATCH_ROWS = 1000
+
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+def iter_records(columns):
+    """ Yields the rows of a {column: values} mapping as dicts. """
+    names = list(columns)
+    for values in zip(*columns.values()):
+        yield dict(zip(names, values))
+
+
+def dumps(obj):
+    """ Compact JSON bytes; values orjson cannot encode natively fall back to str(). """
+    return orjson.dumps(obj, default=str, option=_JSON_OPTIONS)
+
+
+def ndjson_batches(columns, batch_rows=STREAM_BATCH_ROWS):
+    """ Yields the records as NDJSON, `batch_rows` lines per chunk. """
+    records = iter_records(columns)
+    while True:
+        batch = [dumps(record) for record in islice(records, batch_rows)]
+        if not batch:
+            return
+        yield b"\n".join(batch) + b"\n"
+
+
+def columnar_bytes(columns, output):
+    """ Encodes the columns as a Parquet file or an Arrow IPC file. Requires pyarrow. """
+    if not COLUMNAR_AVAILABLE:
+        raise RuntimeError("pyarrow is not installed")
+    table = pyarrow.table(dict(columns))
+    sink = pyarrow.BufferOutputStream()
+    if output == "parquet":
+        pyarrow.parquet.write_table(table, sink)
+    else:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
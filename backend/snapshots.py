@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from ingestion import CANDIDATE_SCHEMA, read_table
+
+
+class SnapshotNotFound(KeyError):
+    """ Raised when a snapshot id is not present in the store. """
+
+
+class SnapshotInputError(ValueError):
+    """ Raised when candidates or a re-allocation delta do not fit a snapshot. """
+
+
+class AllocationSnapshot:
+    """
+    The outcome of one allocation run against a catalog: the candidate
+    table, the effective internship capacities and, per candidate, the
+    assigned internship position (-1 if none), its score and its reason.
+    """
+
+    def __init__(self, catalog_id, strategy, candidates, capacity, assignment, scores, reasons,
+                 snapshot_id=None, parent_id=None):
+        self.catalog_id = catalog_id
+        self.strategy = strategy
+        self.candidates = candidates
+        self.capacity = capacity
+        self.assignment = assignment
+        self.scores = scores
+        self.reasons = reasons
+        self.snapshot_id = snapshot_id
+        self.parent_id = parent_id
+
+
+class SnapshotStore:
+    """
+    Allocation snapshots on disk, one directory per snapshot. Like catalogs
+    they are written to a staging directory and renamed into place, so all
+    uvicorn workers can share the store. Only the newest `max_snapshots`
+    are kept.
+    """
+
+    def __init__(self, root, max_snapshots=100):
+        self.root = root
+        self.max_snapshots = max_snapshots
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, snapshot_id, *parts):
+        if not snapshot_id.isalnum():
+            raise SnapshotNotFound(snapshot_id)
+        return os.path.join(self.root, snapshot_id, *parts)
+
+    def save(self, snapshot):
+        snapshot.snapshot_id = uuid.uuid4().hex
+        staging = tempfile.mkdtemp(dir=self.root, prefix=".staging-")
+        try:
+            snapshot.candidates.to_csv(os.path.join(staging, "candidates.csv"), index=False)
+            np.save(os.path.join(staging, "capacity.npy"), snapshot.capacity)
+            np.save(os.path.join(staging, "assignment.npy"), snapshot.assignment)
+            np.save(os.path.join(staging, "scores.npy"), snapshot.scores)
+            with open(os.path.join(staging, "reasons.json"), "w") as f:
+                json.dump(snapshot.reasons, f)
+            with open(os.path.join(staging, "manifest.json"), "w") as f:
+                json.dump({
+                    "snapshot_id": snapshot.snapshot_id,
+                    "parent_id": snapshot.parent_id,
+                    "catalog_id": snapshot.catalog_id,
+                    "strategy": snapshot.strategy,
+                    "candidates": len(snapshot.candidates),
+                    "assigned": int((snapshot.assignment >= 0).sum()),
+                    "created_at": time.time(),
+                }, f)
+            os.rename(staging, self._path(snapshot.snapshot_id))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._evict()
+        return snapshot.snapshot_id
+
+    def load(self, snapshot_id):
+        try:
+            with open(self._path(snapshot_id, "manifest.json")) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise SnapshotNotFound(snapshot_id)
+        with open(self._path(snapshot_id, "candidates.csv"), "rb") as f:
+            candidates = read_table(f, CANDIDATE_SCHEMA, source="stored")
+        with open(self._path(snapshot_id, "reasons.json")) as f:
+            reasons = json.load(f)
+        return AllocationSnapshot(
+            manifest["catalog_id"], manifest["strategy"], candidates,
+            np.load(self._path(snapshot_id, "capacity.npy")),
+            np.load(self._path(snapshot_id, "assignment.npy")),
+            np.load(self._path(snapshot_id, "scores.npy")),
+            reasons, snapshot_id=snapshot_id, parent_id=manifest["parent_id"],
+        )
+
+    def _evict(self):
+        entries = []
+        for snapshot_id in os.listdir(self.root):
+            if not snapshot_id.isalnum():
+                continue  # staging directories
+            try:
+                entries.append((os.path.getmtime(self._path(snapshot_id, "manifest.json")), snapshot_id))
+            except OSError:
+                continue
+        for _, snapshot_id in sorted(entries, reverse=True)[self.max_snapshots:]:
+            shutil.rmtree(self._path(snapshot_id), ignore_errors=True)
@@ -0,0 +1,14 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from catalog import CatalogStore
+from snapshots import SnapshotStore
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "catalog_store", CatalogStore(str(tmp_path / "catalogs")))
+    monkeypatch.setattr(main, "snapshot_store", SnapshotStore(str(tmp_path / "snapshots")))
+    with TestClient(main.app) as client:
+        yield client
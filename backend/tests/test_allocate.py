@@ -0,0 +1,51 @@
+import io
+import json
+from pathlib import Path
+
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+import pytest
+
+import main
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def post_allocate(client, output):
+    with open(BACKEND_DIR / "candidates.csv", "rb") as candidates, \
+            open(BACKEND_DIR / "internships.csv", "rb") as internships:
+        return client.post(f"/allocate?format={output}", files={"candidates": candidates, "internships": internships})
+
+
+@pytest.mark.parametrize("output", ["ndjson", "parquet", "arrow"])
+def test_output_formats_match_json(client, output):
+    expected = post_allocate(client, "json").json()["allocations"]
+    response = post_allocate(client, output)
+    assert response.status_code == 200
+    if output == "ndjson":
+        records = [json.loads(line) for line in response.text.splitlines()]
+    elif output == "parquet":
+        records = pyarrow.parquet.read_table(io.BytesIO(response.content)).to_pylist()
+    else:
+        records = pyarrow.ipc.open_file(pyarrow.BufferReader(response.content)).read_all().to_pylist()
+    assert records == expected
+
+
+def header_only(path):
+    with open(path, "rb") as f:
+        return f.readline()
+
+
+@pytest.mark.parametrize("mode", ["corpus", "pairwise"])
+@pytest.mark.parametrize("strategy", ["greedy", "optimal"])
+@pytest.mark.parametrize("empty", ["candidates", "internships", "both"])
+def test_header_only_uploads_allocate_nothing(client, monkeypatch, mode, strategy, empty):
+    monkeypatch.setattr(main.RecommendationConfig, "SCORING_MODE", mode)
+    files = {}
+    for table in ("candidates", "internships"):
+        path = BACKEND_DIR / f"{table}.csv"
+        files[table] = (f"{table}.csv", header_only(path) if empty in (table, "both") else path.read_bytes())
+    response = client.post(f"/allocate?strategy={strategy}", files=files)
+    assert response.status_code == 200
+    assert response.json() == {"allocations": []}
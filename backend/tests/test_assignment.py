@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from assignment import DenseScores, GreedyStrategy, OptimalStrategy, get_strategy, top_k
+
+
+class Config:
+    ALLOCATION_TOP_K = 50
+
+
+def random_case(seed, n_candidates=12, n_internships=5):
+    rng = np.random.default_rng(seed)
+    scores = rng.random((n_candidates, n_internships))
+    scores[rng.random(scores.shape) < 0.1] = 0.0
+    capacity = rng.integers(0, 4, size=n_internships)
+    return scores, capacity
+
+
+def legacy_greedy(scores, capacity):
+    """ The original iterrows loop: each candidate in file order takes the first best open internship. """
+    capacity = list(capacity)
+    assignment = []
+    for row in scores:
+        options = sorted(((score, col) for col, score in enumerate(row) if capacity[col] > 0),
+                         key=lambda option: option[0], reverse=True)
+        if not options:
+            assignment.append(-1)
+            continue
+        best = options[0][1]
+        capacity[best] -= 1
+        assignment.append(best)
+    return np.array(assignment)
+
+
+def best_total(scores, capacity):
+    """ Optimal total score by solving the seat-expanded problem with linear_sum_assignment. """
+    seat_owner = np.repeat(np.arange(scores.shape[1]), capacity)
+    # One zero-score "unassigned" column per candidate keeps the problem feasible.
+    expanded = np.hstack((scores[:, seat_owner], np.zeros((scores.shape[0], scores.shape[0]))))
+    rows, cols = linear_sum_assignment(expanded, maximize=True)
+    return expanded[rows, cols].sum()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_optimal_matches_linear_sum_assignment(seed):
+    scores, capacity = random_case(seed)
+    assignment = OptimalStrategy(Config).assign(DenseScores(scores), capacity)
+    assigned = np.flatnonzero(assignment >= 0)
+    assert scores[assigned, assignment[assigned]].sum() == pytest.approx(best_total(scores, capacity))
+
+
+@pytest.mark.parametrize("strategy", ["greedy", "optimal"])
+@pytest.mark.parametrize("seed", range(20))
+def test_capacity_is_never_exceeded(strategy, seed):
+    scores, capacity = random_case(seed, n_candidates=30)
+    assignment = get_strategy(strategy, Config).assign(DenseScores(scores), capacity)
+    load = np.bincount(assignment[assignment >= 0], minlength=len(capacity))
+    assert (load <= capacity).all()
+    # Nobody is left out while a seat is still free.
+    assert (assignment >= 0).all() or load.sum() == capacity.sum()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_greedy_matches_legacy_loop(seed):
+    scores, capacity = random_case(seed, n_candidates=30)
+    # Coarse scores produce ties, which the legacy loop breaks by file order.
+    scores = np.round(scores, 1)
+    assignment = GreedyStrategy(Config).assign(DenseScores(scores), capacity)
+    np.testing.assert_array_equal(assignment, legacy_greedy(scores, capacity))
+
+
+def test_top_k_keeps_best_open_internships():
+    scores, capacity = random_case(0, n_candidates=8, n_internships=6)
+    capacity[[1, 4]] = 0
+    kept = top_k(DenseScores(scores), 2, capacity).toarray()
+    for row, kept_row in zip(scores, kept):
+        open_cols = np.flatnonzero(capacity > 0)
+        best = open_cols[np.argsort(-row[open_cols])[:2]]
+        assert set(np.flatnonzero(kept_row)) <= set(best)
+        np.testing.assert_allclose(kept_row[best], row[best])
+
+
+@pytest.mark.parametrize("strategy", ["greedy", "optimal"])
+def test_zero_capacity_assigns_nobody(strategy):
+    scores, _ = random_case(1)
+    assignment = get_strategy(strategy, Config).assign(DenseScores(scores), np.zeros(scores.shape[1], dtype=int))
+    assert (assignment == -1).all()
+
+
+@pytest.mark.parametrize("strategy", ["greedy", "optimal"])
+@pytest.mark.parametrize("shape", [(0, 0), (0, 3), (3, 0)])
+def test_empty_inputs(strategy, shape):
+    assignment = get_strategy(strategy, Config).assign(DenseScores(np.zeros(shape)), np.ones(shape[1], dtype=int))
+    np.testing.assert_array_equal(assignment, np.full(shape[0], -1))
+
+
+@pytest.mark.parametrize("strategy", ["greedy", "optimal"])
+def test_progress_reports_final_counts_when_seats_run_out(strategy):
+    scores, _ = random_case(2, n_candidates=20)
+    capacity = np.array([1, 0, 2, 0, 1])
+    counts = {}
+    assignment = get_strategy(strategy, Config, lambda **c: counts.update(c)).assign(DenseScores(scores), capacity)
+    assert counts == {"scored": 20, "assigned": int((assignment >= 0).sum())}
+    assert counts["assigned"] == 4
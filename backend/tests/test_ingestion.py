@@ -0,0 +1,86 @@
+import io
+import pickle
+
+import pytest
+from openpyxl import Workbook
+
+import ingestion
+from ingestion import CANDIDATE_SCHEMA, INTERNSHIP_SCHEMA, MAX_REPORTED_ERRORS, IngestionError, read_table
+
+
+def csv_stream(text, encoding="utf-8"):
+    return io.BytesIO(text.encode(encoding))
+
+
+def internships_csv(capacities):
+    return "id,title,capacity,location\n" + "".join(
+        f"{i},Role {i},{capacity},Delhi\n" for i, capacity in enumerate(capacities, start=1))
+
+
+def test_reads_csv_with_schema_dtypes():
+    table = read_table(csv_stream(internships_csv([2, " 3 ", ""])), INTERNSHIP_SCHEMA, "internships.csv")
+    assert table["capacity"].tolist() == [2, 3, 0]
+    assert table["capacity"].dtype == "int64"
+    assert table["location"].dtype == "category"
+
+
+def test_missing_required_columns():
+    with pytest.raises(IngestionError) as info:
+        read_table(csv_stream("id,location\n1,Delhi\n"), INTERNSHIP_SCHEMA, "internships.csv")
+    assert info.value.errors == ["missing required column(s): title, capacity"]
+
+
+def test_non_integer_capacity_reports_row_numbers(monkeypatch):
+    # Small chunks check that row numbers carry across chunk boundaries.
+    monkeypatch.setattr(ingestion, "CHUNK_ROWS", 2)
+    with pytest.raises(IngestionError) as info:
+        read_table(csv_stream(internships_csv([1, "two", 3, 4, "2.5"])), INTERNSHIP_SCHEMA, "internships.csv")
+    assert info.value.errors == ["row 2: capacity 'two' is not an integer",
+                                 "row 5: capacity '2.5' is not an integer"]
+
+
+def test_error_list_is_capped_but_counted():
+    with pytest.raises(IngestionError) as info:
+        read_table(csv_stream(internships_csv(["x"] * 25)), INTERNSHIP_SCHEMA, "internships.csv")
+    error = info.value
+    assert len(error.errors) == MAX_REPORTED_ERRORS
+    assert error.total == 25
+    assert str(error).endswith(f"(and {25 - MAX_REPORTED_ERRORS} more)")
+    restored = pickle.loads(pickle.dumps(error))
+    assert (restored.errors, restored.total, str(restored)) == (error.errors, error.total, str(error))
+
+
+def test_bad_utf8():
+    with pytest.raises(IngestionError) as info:
+        read_table(csv_stream("name,category\nJosé,General\n", encoding="latin-1"), CANDIDATE_SCHEMA, "c.csv")
+    assert info.value.errors == ["file is not valid UTF-8"]
+
+
+def test_ragged_lines():
+    with pytest.raises(IngestionError) as info:
+        read_table(csv_stream("name,category\nAsha,General\nRavi,Rural,extra,fields\n"), CANDIDATE_SCHEMA, "c.csv")
+    assert "Expected 2 fields" in info.value.errors[0]
+
+
+def test_empty_file():
+    with pytest.raises(IngestionError) as info:
+        read_table(csv_stream(""), CANDIDATE_SCHEMA, "c.csv")
+    assert info.value.errors == ["file is empty"]
+
+
+def test_reads_excel(monkeypatch):
+    monkeypatch.setattr(ingestion, "CHUNK_ROWS", 2)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append([" id ", "title", "capacity", "location"])
+    for row in ([1, "Analyst", 2, "Delhi"], [2, "Designer", None, "Pune"], [3, "Engineer", 4, "Delhi"]):
+        sheet.append(row)
+    stream = io.BytesIO()
+    workbook.save(stream)
+    stream.seek(0)
+
+    table = read_table(stream, INTERNSHIP_SCHEMA, "internships.xlsx")
+    assert table.columns.tolist() == ["id", "title", "capacity", "location"]
+    assert table["title"].tolist() == ["Analyst", "Designer", "Engineer"]
+    assert table["capacity"].tolist() == [2, 0, 4]
+    assert sorted(table["location"].cat.categories) == ["Delhi", "Pune"]
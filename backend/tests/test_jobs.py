@@ -0,0 +1,27 @@
+import time
+from pathlib import Path
+
+from benchmarks.generate import generate_workload
+
+
+def wait_for(client, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["status"] not in ("queued", "running"):
+            return status
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_completed_job_reports_final_progress(client, tmp_path):
+    # Far more candidates than seats, so greedy stops once every seat is taken.
+    candidates_path, internships_path = generate_workload(tmp_path, 500, 10, seed=1)
+    files = {"candidates": Path(candidates_path).read_bytes(), "internships": Path(internships_path).read_bytes()}
+    job_id = client.post("/jobs", files={name: (f"{name}.csv", data) for name, data in files.items()}).json()["job_id"]
+
+    status = wait_for(client, job_id)
+    results = client.get(f"/jobs/{job_id}/results").json()
+    assert status["status"] == "completed"
+    assert status["progress"]["candidates_scored"] == 500
+    assert status["progress"]["candidates_assigned"] == results["total"]
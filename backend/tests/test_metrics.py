@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import metrics
+from catalog import CatalogStore
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def sample(metric, **labels):
+    """ Current value of a counter, or observation count of a histogram, for one label set. """
+    value = metric._values.get(metric._key(labels))
+    if isinstance(metric, metrics.Histogram):
+        return value[0][-1] if value else 0
+    return value or 0.0
+
+
+def post_allocate(client, query=""):
+    with open(BACKEND_DIR / "candidates.csv", "rb") as candidates, \
+            open(BACKEND_DIR / "internships.csv", "rb") as internships:
+        return client.post(f"/allocate?{query}", files={"candidates": candidates, "internships": internships})
+
+
+def test_streamed_response_is_recorded_after_its_body(client):
+    requests_before = sample(metrics.REQUEST_LATENCY, method="POST", path="/allocate", status=200)
+    serialize_before = sample(metrics.STAGE_LATENCY, stage="serialize")
+    response = post_allocate(client, "format=ndjson")
+    assert response.status_code == 200
+    assert "serialize" not in response.headers["Server-Timing"]
+    assert sample(metrics.REQUEST_LATENCY, method="POST", path="/allocate", status=200) == requests_before + 1
+    assert sample(metrics.STAGE_LATENCY, stage="serialize") == serialize_before + 1
+    assert sample(metrics.REQUESTS_IN_FLIGHT) == 0
+
+
+def test_reloads_are_counted_apart_from_uploads(tmp_path):
+    rows = len((BACKEND_DIR / "internships.csv").read_text().splitlines()) - 1
+    uploaded = sample(metrics.ROWS_PROCESSED, table="internships", source="upload")
+    stored = sample(metrics.ROWS_PROCESSED, table="internships", source="stored")
+    with open(BACKEND_DIR / "internships.csv", "rb") as f:
+        catalog_id = CatalogStore(str(tmp_path)).put(f)[0]["catalog_id"]
+    # A fresh store (another worker, or after eviction) reads the stored table back from disk.
+    CatalogStore(str(tmp_path)).get(catalog_id)
+    assert sample(metrics.ROWS_PROCESSED, table="internships", source="upload") == uploaded + rows
+    assert sample(metrics.ROWS_PROCESSED, table="internships", source="stored") == stored + rows
@@ -0,0 +1,55 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import main
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def snapshot_id(client):
+    with open(BACKEND_DIR / "candidates.csv", "rb") as candidates, \
+            open(BACKEND_DIR / "internships.csv", "rb") as internships:
+        response = client.post("/allocate?snapshot=true", files={"candidates": candidates, "internships": internships})
+    assert response.status_code == 200
+    return response.json()["snapshot_id"]
+
+
+def test_reallocate_with_partial_candidate_columns(client, snapshot_id):
+    added = io.BytesIO(b"id,name,skills\n12,Other,python\n")
+    response = client.post(f"/reallocate?snapshot_id={snapshot_id}", files={"added": ("added.csv", added)})
+    assert response.status_code == 200
+    changes = {change["candidate_id"]: change for change in response.json()["changes"]}
+    assert changes["12"]["change"] == "added"
+
+
+def test_reallocate_rejects_unknown_candidate(client, snapshot_id):
+    response = client.post(f"/reallocate?snapshot_id={snapshot_id}", data={"removed": "404"})
+    assert response.status_code == 400
+    assert "404" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("value", ["null", "[1]", '"abc"', "-1", "2.5", "true"])
+def test_reallocate_rejects_invalid_capacity(client, snapshot_id, value):
+    response = client.post(f"/reallocate?snapshot_id={snapshot_id}", data={"capacity": f'{{"101": {value}}}'})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Capacity of internship 101 must be a non-negative integer."
+
+
+def test_reallocate_releases_seats_of_closed_internship(client, snapshot_id):
+    response = client.post(f"/reallocate?snapshot_id={snapshot_id}", data={"capacity": '{"101": 0}'})
+    assert response.status_code == 200
+    assert all(allocation["Internship"] != "Data Science Intern" for allocation in response.json()["allocations"])
+
+
+def test_reallocate_failure_is_logged_and_counted(client, snapshot_id, monkeypatch, caplog):
+    def fail(*args, **kwargs):
+        raise ValueError("solver exploded")
+    monkeypatch.setattr(main.InternshipRecommender, "reallocate", fail)
+    response = client.post(f"/reallocate?snapshot_id={snapshot_id}", data={"removed": "1"})
+    assert response.status_code == 500
+    assert "solver exploded" not in response.json()["detail"]
+    assert "Re-allocation failed" in caplog.text
+    assert 'allocation_failures_total{endpoint="reallocate"}' in client.get("/metrics").text
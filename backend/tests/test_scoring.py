@@ -0,0 +1,87 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import main
+from benchmarks.generate import generate_workload
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def legacy_similarity(text1, text2):
+    try:
+        text1 = str(text1) if text1 is not None else ""
+        text2 = str(text2) if text2 is not None else ""
+        if not text1 and not text2:
+            return 0.0
+        tfidf_matrix = TfidfVectorizer(stop_words='english').fit_transform([text1, text2])
+        return cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+    except Exception:
+        return 0.0
+
+
+def legacy_allocations(candidates_csv, internships_csv):
+    """ The original _calculate_score / iterrows allocation, kept as the reference for pairwise mode. """
+    config = main.RecommendationConfig
+    candidates_df = pd.read_csv(io.BytesIO(candidates_csv))
+    internships_df = pd.read_csv(io.BytesIO(internships_csv))
+    internships_df['capacity'] = pd.to_numeric(internships_df['capacity'], errors='coerce').fillna(0).astype(int)
+
+    allocations = []
+    for _, candidate in candidates_df.iterrows():
+        scores = []
+        for _, internship in internships_df.iterrows():
+            if internship['capacity'] <= 0:
+                continue
+            base_score = (legacy_similarity(candidate.get('skills', ''), internship.get('required_skills', ''))
+                          * config.SKILLS_WEIGHT
+                          + legacy_similarity(candidate.get('qualifications', ''), internship.get('qualifications', ''))
+                          * config.QUALIFICATIONS_WEIGHT
+                          + (1 if str(candidate.get('location_preferences', '')).lower()
+                             == str(internship.get('location', '')).lower() else 0) * config.LOCATION_WEIGHT
+                          + legacy_similarity(candidate.get('sector_interests', ''), internship.get('sector', ''))
+                          * config.INTERESTS_WEIGHT)
+            reason = f"Base score ({base_score:.2f}) from skills, qualifications, location, and interests."
+            if str(candidate.get('category', '')).strip().lower() == 'rural':
+                base_score += config.RURAL_BONUS
+                reason += f" Rural bonus (+{config.RURAL_BONUS}) applied."
+            if str(candidate.get('past_internship', '')).strip().lower() == 'true':
+                base_score -= config.PAST_INTERNSHIP_PENALTY
+                reason += f" Past internship penalty (-{config.PAST_INTERNSHIP_PENALTY}) applied."
+            scores.append((np.clip(base_score, 0, 1), reason, internship))
+        if scores:
+            scores.sort(key=lambda x: x[0], reverse=True)
+            best_score, best_reason, best_internship = scores[0]
+            allocations.append({
+                "Candidate": candidate['name'],
+                "Internship": best_internship['title'],
+                "Score": float(best_score),
+                "Reason": best_reason,
+                "Category": candidate.get('category', 'N/A'),
+                "Location": best_internship.get('location', 'N/A'),
+            })
+            internships_df.loc[internships_df['id'] == best_internship['id'], 'capacity'] -= 1
+    return sorted(allocations, key=lambda x: x['Score'], reverse=True)
+
+
+@pytest.fixture(params=["sample", "generated"])
+def upload(request, tmp_path):
+    if request.param == "sample":
+        paths = BACKEND_DIR / "candidates.csv", BACKEND_DIR / "internships.csv"
+    else:
+        paths = generate_workload(tmp_path, 40, 8, seed=3)
+    return tuple(Path(path).read_bytes() for path in paths)
+
+
+def test_pairwise_mode_reproduces_legacy_scores(client, monkeypatch, upload):
+    monkeypatch.setattr(main.RecommendationConfig, "SCORING_MODE", "pairwise")
+    candidates_csv, internships_csv = upload
+    response = client.post("/allocate", files={"candidates": ("candidates.csv", candidates_csv),
+                                                "internships": ("internships.csv", internships_csv)})
+    assert response.status_code == 200
+    assert response.json()["allocations"] == legacy_allocations(candidates_csv, internships_csv)
@@ -27,6 +27,12 @@ function App() {
     setView("results");
   };
 
+  const handleGenerationError = (message: string) => {
+    setError(message);
+    // A stream can fail after partial results were shown; go back to the form.
+    if (message) setView("upload");
+  };
+
   const handleReset = () => {
     setAllocations([]);
     setCandidates([]);
@@ -62,7 +68,7 @@ function App() {
           <FileUpload
             key="upload"
             onAllocationsGenerated={handleAllocationsGenerated}
-            onGenerationError={setError}
+            onGenerationError={handleGenerationError}
             error={error}
           />
         );
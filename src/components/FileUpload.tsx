@@ -107,15 +107,19 @@ export function FileUpload({
     setIsLoading(true);
     onGenerationError(""); // Clear previous errors
     try {
-      // First, run the allocation on the backend
-      const allocations = await allocate(candidateFile, internshipFile);
-
-      // Concurrently, parse the CSVs on the frontend for analytics
+      // Parse the CSVs on the frontend for analytics
       const [candidates, internships] = await Promise.all([
         parseCsvFile<Candidate>(candidateFile),
         parseCsvFile<Internship>(internshipFile),
       ]);
 
+      // Then run the allocation on the backend, showing results as they stream in
+      const allocations = await allocate(candidateFile, internshipFile, (received) => {
+        if (received.length > 0) {
+          onAllocationsGenerated({ allocations: [...received], candidates, internships });
+        }
+      });
+
       onAllocationsGenerated({ allocations, candidates, internships });
     } catch (err: any) {
       const errorMessage = err.message.includes("Failed to fetch")
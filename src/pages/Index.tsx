@@ -31,6 +31,8 @@ export default function Index() {
 
   const handleGenerationError = (message: string) => {
     setError(message);
+    // A stream can fail after partial results were shown; go back to the form.
+    if (message) setView("upload");
   };
 
   const handleReset = () => {
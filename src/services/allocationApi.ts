@@ -1,17 +1,23 @@
-import { Allocation, AllocationResponse } from "../types";
+import { Allocation } from "../types";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:8000";
 
+/**
+ * Requests allocations as NDJSON so they can be parsed while the server is
+ * still sending them. `onBatch`, if given, receives every allocation parsed
+ * so far each time a chunk arrives.
+ */
 export const allocate = async (
   candidatesFile: File,
-  internshipsFile: File
+  internshipsFile: File,
+  onBatch?: (allocations: Allocation[]) => void
 ): Promise<Allocation[]> => {
   const formData = new FormData();
   formData.append("candidates", candidatesFile);
   formData.append("internships", internshipsFile);
 
   try {
-    const response = await fetch(`${API_BASE_URL}/allocate`, {
+    const response = await fetch(`${API_BASE_URL}/allocate?format=ndjson`, {
       method: "POST",
       body: formData,
     });
@@ -25,8 +31,21 @@ export const allocate = async (
       );
     }
 
-    const data: AllocationResponse = await response.json();
-    return data.allocations;
+    const allocations: Allocation[] = [];
+    const reader = response.body!.pipeThrough(new TextDecoderStream()).getReader();
+    let buffered = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (value) buffered += value;
+      const lines = done ? [buffered] : buffered.split("\n");
+      buffered = done ? "" : lines.pop() ?? "";
+      for (const line of lines) {
+        if (line.trim()) allocations.push(JSON.parse(line));
+      }
+      if (done) break;
+      onBatch?.(allocations);
+    }
+    return allocations;
   } catch (error) {
     console.error("API call failed:", error);
     if (error instanceof Error && error.message.includes("Failed to fetch")) {